@@ -1,18 +1,13 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Body
+from fastapi import FastAPI, UploadFile, File, HTTPException, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response, PlainTextResponse
 import uvicorn
 import os
 import json
-import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Dict, Any, Optional
-import io
-import re
-import base64
-from cryptography.fernet import Fernet
-import hashlib
+from contextlib import aclosing
+import time
 
 from pydantic import BaseModel, Field
 
@@ -25,7 +20,18 @@ from backend.app.services.scoring import fairscore_v0
 from backend.app.services.fairness import statistical_parity, equal_opportunity, threshold_shift
 from backend.app.services.forecast import cashflow_forecast
 from backend.app.services.ledgers import private_append
-from backend.app.services.granite import advise, granite_ready
+from backend.app.services.granite import granite_ready
+from backend.app.services.advisor import AsyncAdvisor, AdvisorBusy
+from backend.app.services.features import extract_features_from_transactions
+from backend.app.services.context import ContextCache
+from backend.app.services.datasets import DatasetStore, DatasetNotFound
+from backend.app import wire
+from backend.app.utils import histogram, render_metrics, SamplingProfiler
+from backend.app import config
+from backend.app.config import PROFILE_REQUESTS, PROFILE_DIR, WARMUP_ON_START
+from backend.app.services import granite
+from backend.app.warmup import warm_up, prime_forecast
+from fastapi.concurrency import run_in_threadpool
 
 # ---------- Pydantic Models ----------
 class Transaction(BaseModel):
@@ -38,11 +44,13 @@ class Transaction(BaseModel):
     ref: Optional[str] = None
 
 class AnalyzeTransactionsRequest(BaseModel):
-    transactions: List[Transaction]
+    transactions: List[Transaction] = Field(default_factory=list)
+    dataset_id: Optional[str] = None
 
 class ForecastRequest(BaseModel):
     cashflow_data: List[Dict[str, Any]] = Field(default_factory=list)
     days: int = 60
+    dataset_id: Optional[str] = None
 
 class FairnessAuditRequest(BaseModel):
     female_scores: List[float]
@@ -60,7 +68,13 @@ class PublishAuditRequest(BaseModel):
 
 class AdvisorRequest(BaseModel):
     question: str
-    context: Dict[str, Any]
+    context: Dict[str, Any] = Field(default_factory=dict)
+    customer_id: Optional[str] = None
+
+class AdvisorContextRequest(BaseModel):
+    customer_id: str
+    transactions: List[Transaction] = Field(default_factory=list)
+    dataset_id: Optional[str] = None
 
 app = FastAPI(title="Nova Financial Glow API", version="1.0.0")
 
@@ -80,33 +94,88 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load environment variables
-def load_env():
-    env_vars = {}
-    env_file = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if '=' in line and not line.strip().startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    env_vars[key] = value
-    return env_vars
-
-env_vars = load_env()
-
-# Set environment variables for backend services
-os.environ['IBM_CLOUD_API_KEY'] = env_vars.get('IBM_CLOUD_API_KEY', '')
-OS_REGION_DEFAULT = 'https://eu-de.ml.cloud.ibm.com'
-os.environ['IBM_PROJECT_ID'] = env_vars.get('IBM_PROJECT_ID', '')
-os.environ['IBM_REGION'] = env_vars.get('IBM_REGION', OS_REGION_DEFAULT)
-os.environ['GRANITE_MODEL_ID'] = env_vars.get('GRANITE_MODEL_ID', 'ibm/granite-3-8b-instruct')
-os.environ['PRIVATE_LEDGER_SALT'] = env_vars.get('PRIVATE_LEDGER_SALT', 'changeme')
-os.environ['PRIVATE_LEDGER_ENC_KEY'] = env_vars.get('PRIVATE_LEDGER_ENC_KEY', '')
+def save_profile(profiler: SamplingProfiler, method: str, route: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{method}{route.replace('/', '_')}.folded")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.stop())
+    return path
+
+async def observe_stream(body, observe):
+    """Pass a streamed body through, recording how long it took once the stream ends or is closed"""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        close = getattr(body, "aclose", None)
+        if close:
+            await close()
+        observe()
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Per-route latency histogram; with FINEO_PROFILE=1, `?profile=1` dumps a sampled profile of the request
+
+    For server-sent event streams the request histogram (and any profile) covers
+    the time to the response headers; the full stream duration is recorded in
+    `fineo_http_stream_seconds`.
+    """
+    profiler = SamplingProfiler().start() if PROFILE_REQUESTS and request.query_params.get("profile") == "1" else None
+    start = time.perf_counter()
+    profile_path = None
+    try:
+        response = await call_next(request)
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        histogram("fineo_http_request_seconds", method=request.method, route=route).observe(time.perf_counter() - start)
+        if profiler is not None:
+            profile_path = save_profile(profiler, request.method, route)
+    if profile_path:
+        response.headers["X-Profile-File"] = profile_path
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        stream_seconds = histogram("fineo_http_stream_seconds", method=request.method, route=route)
+        response.body_iterator = observe_stream(response.body_iterator, lambda: stream_seconds.observe(time.perf_counter() - start))
+    return response
+
+advisor = AsyncAdvisor()
+advisor_contexts = ContextCache()
+datasets = DatasetStore()
+
+def respond(request: Request, payload: Dict[str, Any]) -> Response:
+    """Encode large payloads with orjson, or a columnar format the client asked for via Accept"""
+    media_type = wire.negotiate(request.headers.get("accept", ""))
+    return Response(content=wire.encode(payload, media_type), media_type=media_type, headers={"Vary": "Accept"})
+
+def dataset_not_found(e: DatasetNotFound) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"Dataset not found or expired: {e.args[0]}")
+
+def advisor_context(req: AdvisorRequest) -> Dict[str, Any]:
+    """Prefer the cached per-customer digest over the raw client-supplied context"""
+    if req.customer_id:
+        digest = advisor_contexts.get(req.customer_id)
+        if digest is not None:
+            return digest
+    return req.context
+
+@app.on_event("startup")
+async def start_warm_up():
+    # pandas/statsmodels/pdfplumber/cryptography load lazily; pull them in off the request path
+    if WARMUP_ON_START:
+        warm_up(granite.warm_client, prime_forecast)
+
+@app.on_event("shutdown")
+async def shutdown_advisor():
+    advisor.close()
 
 @app.get("/")
 async def root():
     return {"message": "Nova Financial Glow API Server"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint: per-stage and per-route latency histograms"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     try:
@@ -116,7 +185,7 @@ async def health_check():
         return {"status": "healthy", "granite_ready": False, "timestamp": datetime.now().isoformat()}
 
 @app.post("/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
+async def upload_pdf(request: Request, file: UploadFile = File(...)):
     """Upload and parse passbook PDF"""
     try:
         if not file.filename.endswith('.pdf'):
@@ -125,14 +194,33 @@ async def upload_pdf(file: UploadFile = File(...)):
         transactions = parse_passbook_pdf(content)
         if not transactions:
             raise HTTPException(status_code=400, detail="No transactions found in PDF")
-        return {"success": True, "transactions": transactions, "count": len(transactions)}
+        dataset_id = await run_in_threadpool(datasets.put, transactions)
+        return respond(request, {"success": True, "dataset_id": dataset_id, "transactions": transactions, "count": len(transactions)})
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
+@app.post("/pipeline")
+async def run_pipeline(request: Request, file: UploadFile = File(...), days: int = 60):
+    """Parse a passbook PDF once and run summary, features, FairScore and forecast in one call"""
+    try:
+        if not file.filename.endswith('.pdf'):
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+        content = await file.read()
+        from backend.app.services.pipeline import Pipeline
+        pipeline = await run_in_threadpool(Pipeline.from_pdf, content, days)
+        if pipeline.frame.empty:
+            raise HTTPException(status_code=400, detail="No transactions found in PDF")
+        result = await run_in_threadpool(pipeline.run)
+        return respond(request, {"success": True, "transactions": pipeline.frame.to_dict("records"), **result})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running pipeline: {str(e)}")
+
 @app.get("/sample-transactions")
-async def sample_transactions():
+async def sample_transactions(request: Request):
     """Parse and return transactions from bundled dummy PDF"""
     try:
         candidates = [
@@ -149,65 +237,32 @@ async def sample_transactions():
         transactions = parse_passbook_pdf(content)
         if not transactions:
             raise HTTPException(status_code=400, detail="No transactions found in sample PDF")
-        return {"success": True, "transactions": transactions, "count": len(transactions)}
+        return respond(request, {"success": True, "transactions": transactions, "count": len(transactions)})
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading sample PDF: {str(e)}")
 
 @app.post("/analyze-transactions")
-async def analyze_transactions(req: AnalyzeTransactionsRequest):
+async def analyze_transactions(req: AnalyzeTransactionsRequest, request: Request):
     """Analyze transactions and generate summary"""
     try:
+        if req.dataset_id:
+            summary = await run_in_threadpool(datasets.summary, req.dataset_id)
+            features = await run_in_threadpool(datasets.features, req.dataset_id)
+            return respond(request, {"success": True, "summary": summary, "features": features})
         transactions = [t.model_dump() for t in req.transactions]
         for txn in transactions:
             if not txn.get('category'):
                 txn['category'] = auto_category(txn.get('description', ''))
         summary = summarize(transactions)
         features = extract_features_from_transactions(transactions)
-        return {"success": True, "summary": summary, "features": features}
+        return respond(request, {"success": True, "summary": summary, "features": features})
+    except DatasetNotFound as e:
+        raise dataset_not_found(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing transactions: {str(e)}")
 
-def extract_features_from_transactions(transactions: List[Dict[str, Any]]) -> Dict[str, float]:
-    if not transactions:
-        return {"pay_hist": 0.7, "utilization": 0.4, "savings_rate": 0.2, "cashflow_var": 0.3, "history_len": 0.3, "sip_regularity": 0.5, "mandate_punctual": 0.7}
-    inflow = sum(t.get('credit', 0) for t in transactions)
-    outflow = sum(t.get('debit', 0) for t in transactions)
-    savings_rate = max(inflow - outflow, 0) / max(inflow, 1e-6)
-    loanish_patterns = ["emi", "loan", "card", "creditcard", "repay"]
-    loanish_transactions = [t for t in transactions if any(pattern in (t.get('description', '') or '').lower() for pattern in loanish_patterns)]
-    loanish_amount = sum(t.get('debit', 0) for t in loanish_transactions)
-    utilization = min(loanish_amount / max(inflow, 1e-6), 1.0)
-    daily_net: Dict[str, float] = {}
-    for t in transactions:
-        date = (t.get('date', '') or '').split(' ')[0]
-        daily_net[date] = daily_net.get(date, 0.0) + float(t.get('credit', 0) or 0) - float(t.get('debit', 0) or 0)
-    daily_values = list(daily_net.values())
-    if len(daily_values) >= 5:
-        denom = (np.mean([abs(v) for v in daily_values]) or 1.0) * 5
-        cashflow_var = float(min(np.std(daily_values) / denom, 1.0))
-    else:
-        cashflow_var = 0.3
-    unique_months = len(set((t.get('date', '') or '')[:7] for t in transactions))
-    history_len = min(unique_months / 24.0, 1.0)
-    sip_transactions = [t for t in transactions if any(p in (t.get('description', '') or '').lower() for p in ["sip", "mutual fund", "mf", "systematic"])]
-    sip_months = len(set((t.get('date', '') or '')[:7] for t in sip_transactions))
-    total_months = len(set((t.get('date', '') or '')[:7] for t in transactions))
-    sip_regularity = min(sip_months / max(total_months, 1), 1.0)
-    penalty_patterns = ["reversal", "penalty", "charge", "bounce", "return"]
-    penalty_hits = sum(1 for t in transactions if any(pattern in (t.get('description', '') or '').lower() for pattern in penalty_patterns))
-    mandate_punctual = max(0.9 - 0.05 * penalty_hits, 0.0)
-    return {
-        "pay_hist": round(0.85 + 0.1 * (savings_rate - 0.2), 2) if inflow > 0 else 0.7,
-        "utilization": round(utilization, 2),
-        "savings_rate": round(savings_rate, 2),
-        "cashflow_var": round(cashflow_var, 2),
-        "history_len": round(history_len, 2),
-        "sip_regularity": round(sip_regularity, 2),
-        "mandate_punctual": round(mandate_punctual, 2)
-    }
-
 @app.post("/calculate-fairscore")
 async def calculate_fairscore(features: Dict[str, float] = Body(...)):
     try:
@@ -216,19 +271,41 @@ async def calculate_fairscore(features: Dict[str, float] = Body(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating FairScore: {str(e)}")
 
+@app.get("/datasets/{dataset_id}/fairscore")
+async def dataset_fairscore(dataset_id: str):
+    """FairScore from the features of a server-side dataset (memoized)"""
+    try:
+        score, contrib, version = await run_in_threadpool(datasets.fairscore, dataset_id)
+        return {"success": True, "score": score, "contributions": contrib, "version": version}
+    except DatasetNotFound as e:
+        raise dataset_not_found(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculating FairScore: {str(e)}")
+
+@app.delete("/datasets/{dataset_id}")
+async def delete_dataset(dataset_id: str):
+    await run_in_threadpool(datasets.delete, dataset_id)
+    return {"success": True, "dataset_id": dataset_id}
+
 @app.post("/forecast-cashflow")
-async def forecast_cashflow_endpoint(req: ForecastRequest):
+async def forecast_cashflow_endpoint(req: ForecastRequest, request: Request):
     try:
+        if req.dataset_id:
+            forecast = await run_in_threadpool(datasets.forecast, req.dataset_id, req.days)
+            return respond(request, {"success": True, "forecast": forecast})
         cashflow_data = req.cashflow_data or []
         days = req.days
         if not cashflow_data:
             return {"success": True, "forecast": {"dates": [], "mean": [0.0] * days, "lower": [0.0] * days, "upper": [0.0] * days}}
+        import pandas as pd
         df = pd.DataFrame(cashflow_data)
         series = pd.Series(df['amount'].values, index=pd.to_datetime(df['date']))
         mean, lower, upper = cashflow_forecast(series, days)
         last_date = pd.to_datetime(df['date'].iloc[-1])
-        future_dates = [last_date + timedelta(days=i+1) for i in range(days)]
-        return {"success": True, "forecast": {"dates": [d.strftime('%Y-%m-%d') for d in future_dates], "mean": mean, "lower": lower, "upper": upper}}
+        future_dates = pd.date_range(last_date + pd.Timedelta(days=1), periods=days, freq="D")
+        return respond(request, {"success": True, "forecast": {"dates": future_dates.strftime('%Y-%m-%d').tolist(), "mean": mean, "lower": lower, "upper": upper}})
+    except DatasetNotFound as e:
+        raise dataset_not_found(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating forecast: {str(e)}")
 
@@ -253,19 +330,61 @@ async def publish_audit(req: PublishAuditRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error publishing audit: {str(e)}")
 
+@app.post("/advisor-context")
+async def update_advisor_context(req: AdvisorContextRequest):
+    """Build (or reuse, if the data is unchanged) the compact advisor digest for a customer"""
+    try:
+        if req.dataset_id:
+            transactions = await run_in_threadpool(datasets.records, req.dataset_id)
+        else:
+            transactions = [t.model_dump() for t in req.transactions]
+        digest = await run_in_threadpool(advisor_contexts.update, req.customer_id, transactions)
+        return {"success": True, "customer_id": req.customer_id, "context": digest}
+    except DatasetNotFound as e:
+        raise dataset_not_found(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building advisor context: {str(e)}")
+
 @app.post("/ask-advisor")
 async def ask_advisor(req: AdvisorRequest):
     try:
         if not granite_ready():
             return {"success": False, "answer": "Granite credentials missing. Please check your IBM Cloud configuration.", "actions": [], "route": "/insights"}
-        response = advise(req.question, req.context)
+        response = await advisor.ask(req.question, advisor_context(req))
         return {"success": True, **response}
+    except AdvisorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error asking advisor: {str(e)}")
 
+@app.post("/ask-advisor/stream")
+async def ask_advisor_stream(req: AdvisorRequest, request: Request):
+    """Server-sent events: one `data:` message per generated chunk, then `event: done`"""
+    if not granite_ready():
+        raise HTTPException(status_code=503, detail="Granite credentials missing. Please check your IBM Cloud configuration.")
+    try:
+        tokens = await advisor.stream(req.question, advisor_context(req))
+    except AdvisorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    async def events():
+        # closing the token iterator cancels the upstream generation
+        async with aclosing(tokens):
+            try:
+                async for token in tokens:
+                    if await request.is_disconnected():
+                        return
+                    yield f"data: {json.dumps({'token': token})}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+                return
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/granite-status")
 async def granite_status():
-    return {"granite_ready": granite_ready(), "has_api_key": bool(env_vars.get('IBM_CLOUD_API_KEY')), "has_project_id": bool(env_vars.get('IBM_PROJECT_ID')), "region": env_vars.get('IBM_REGION', 'https://eu-de.ml.cloud.ibm.com'), "model_id": env_vars.get('GRANITE_MODEL_ID', 'ibm/granite-3-8b-instruct')}
+    return {"granite_ready": granite_ready(), "has_api_key": bool(config.IBM_CLOUD_API_KEY), "has_project_id": bool(config.IBM_PROJECT_ID), "region": config.IBM_REGION, "model_id": config.GRANITE_MODEL_ID}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,6 +1,20 @@
 import os
-from dotenv import load_dotenv
-load_dotenv()
+
+def _load_env_file():
+    # single .env parse for the whole app: nearest .env from this package upwards, like find_dotenv()
+    d = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(d, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return path
+        parent = os.path.dirname(d)
+        if parent == d:
+            return None
+        d = parent
+
+ENV_FILE = _load_env_file()
 
 IBM_CLOUD_API_KEY = os.getenv("IBM_CLOUD_API_KEY","")
 IBM_PROJECT_ID    = os.getenv("IBM_PROJECT_ID","")
@@ -9,3 +23,20 @@ GRANITE_MODEL_ID  = os.getenv("GRANITE_MODEL_ID","ibm/granite-3-8b-instruct")
 
 PRIVATE_LEDGER_SALT = os.getenv("PRIVATE_LEDGER_SALT","changeme")
 PRIVATE_LEDGER_ENC_KEY = os.getenv("PRIVATE_LEDGER_ENC_KEY","")
+
+ADVISOR_MAX_CONCURRENCY = int(os.getenv("ADVISOR_MAX_CONCURRENCY","4"))
+ADVISOR_MAX_QUEUE       = int(os.getenv("ADVISOR_MAX_QUEUE","32"))
+ADVISOR_BATCH_WINDOW_MS = float(os.getenv("ADVISOR_BATCH_WINDOW_MS","5"))
+ADVISOR_BATCH_MAX       = int(os.getenv("ADVISOR_BATCH_MAX","8"))
+ADVISOR_CONTEXT_TOKENS  = int(os.getenv("ADVISOR_CONTEXT_TOKENS","1500"))
+
+DATASET_MAX_BYTES   = int(os.getenv("DATASET_MAX_BYTES", str(256 * 1024 * 1024)))
+DATASET_MAX_ENTRIES = int(os.getenv("DATASET_MAX_ENTRIES","1024"))
+DATASET_SPILL_DIR   = os.getenv("DATASET_SPILL_DIR","")
+
+# opt-in per-request sampling profiler: set FINEO_PROFILE=1, then add ?profile=1 to a request
+PROFILE_REQUESTS = os.getenv("FINEO_PROFILE","").lower() in ("1","true","yes")
+PROFILE_DIR      = os.getenv("FINEO_PROFILE_DIR","profiles")
+
+# import heavy modules (pandas, statsmodels, pdfplumber, cryptography) in the background after startup
+WARMUP_ON_START = os.getenv("FINEO_WARMUP","1").lower() in ("1","true","yes")
@@ -0,0 +1,103 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from ..config import ADVISOR_MAX_CONCURRENCY, ADVISOR_MAX_QUEUE
+from ..utils import timed
+from . import granite
+
+_DONE = object()
+
+class AdvisorBusy(Exception):
+    """Raised when every generation slot is taken and the wait queue is full."""
+
+class AsyncAdvisor:
+    """Runs blocking Granite calls on a bounded worker pool so the event loop stays free.
+
+    At most `max_concurrency` upstream calls run at once and at most `max_queue`
+    callers wait for a slot; beyond that `AdvisorBusy` is raised so the API can
+    shed load instead of piling up requests.
+    """
+
+    def __init__(self, generate=None, stream=None, max_concurrency: int = ADVISOR_MAX_CONCURRENCY, max_queue: int = ADVISOR_MAX_QUEUE):
+        self._generate = generate or granite.generate
+        self._stream = stream or granite.stream_text
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="advisor")
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    async def _acquire(self):
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            raise AdvisorBusy(f"Advisor is busy ({self.max_concurrency} running, {self._waiting} queued)")
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+    def _submit(self, fn, *args):
+        # the slot is held until the worker thread finishes, not until the caller stops waiting
+        fut = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    @timed()
+    async def ask(self, question: str, context: dict) -> dict:
+        prompt = granite.build_prompt(question, context)
+        await self._acquire()
+        fut = self._submit(self._generate, prompt)
+        try:
+            text = await asyncio.shield(fut)
+        except Exception as e:
+            return {"answer": f"Granite error: {e}", "actions": [], "route": "/insights"}
+        return granite.parse_answer(text)
+
+    async def stream(self, question: str, context: dict):
+        """Reserve a slot and start generating; returns an async iterator of text chunks.
+
+        Closing the iterator (e.g. on client disconnect) stops the upstream stream.
+        """
+        prompt = granite.build_prompt(question, context)
+        await self._acquire()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancel = Event()
+        self._submit(self._pump, prompt, queue, asyncio.get_running_loop(), cancel)
+        return self._drain(queue, cancel)
+
+    def _pump(self, prompt, queue, loop, cancel):
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                cancel.set()  # event loop is gone, nobody is listening
+        chunks = None
+        try:
+            chunks = self._stream(prompt)
+            for chunk in chunks:
+                if cancel.is_set():
+                    break
+                put(chunk)
+        except Exception as e:
+            put(e)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+            put(_DONE)
+
+    @timed("advisor.stream")
+    async def _drain(self, queue, cancel):
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancel.set()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import Future
+from ..utils import timed
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.futures = []
+        self.sealed = threading.Event()
+
+class MicroBatcher:
+    """Coalesces concurrent blocking calls into one batched call.
+
+    The first caller of a batch waits up to `window_ms` (or until `max_batch`
+    items arrive), then runs `run_batch(items)` once and hands each waiting
+    caller its own result. `run_batch` returns one result per item; an
+    Exception in a slot is raised only for that caller.
+    """
+
+    def __init__(self, run_batch, window_ms: float = 5, max_batch: int = 8):
+        self.run_batch = run_batch
+        self.window = max(window_ms, 0) / 1000.0
+        self.max_batch = max(int(max_batch), 1)
+        self._lock = threading.Lock()
+        self._open = None
+
+    @timed()
+    def submit(self, item):
+        fut = Future()
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append(item)
+            batch.futures.append(fut)
+            if len(batch.items) >= self.max_batch:
+                self._open = None
+                batch.sealed.set()
+        if leader:
+            batch.sealed.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._run(batch)
+        return fut.result()
+
+    @timed("batching.run_batch")
+    def _run(self, batch):
+        try:
+            results = list(self.run_batch(list(batch.items)))
+            if len(results) != len(batch.items):
+                raise RuntimeError(f"batch returned {len(results)} results for {len(batch.items)} items")
+        except Exception as e:
+            results = [e] * len(batch.items)
+        for fut, res in zip(batch.futures, results):
+            if isinstance(res, Exception):
+                fut.set_exception(res)
+            else:
+                fut.set_result(res)
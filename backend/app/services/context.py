@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+from ..utils import canonical, sha256_hex, timed
+from .portfolio import summarize
+from .features import extract_features_from_transactions
+from .scoring import fairscore_v0
+from .forecast import cashflow_forecast
+
+DIGEST_VERSION = "0.1"
+FORECAST_DAYS = 30
+
+def _savings_trend(cashflow, months: int = 6):
+    monthly = {}
+    for row in cashflow:
+        m = str(row["date"])[:7]
+        monthly[m] = monthly.get(m, 0.0) + float(row["amount"])
+    recent = [{"month": m, "net": round(v)} for m, v in sorted(monthly.items())[-months:]]
+    direction = "flat"
+    if len(recent) >= 2:
+        half = len(recent) // 2
+        older = sum(r["net"] for r in recent[:half]) / half
+        newer = sum(r["net"] for r in recent[half:]) / (len(recent) - half)
+        # band around `older` that works for negative nets too
+        tol = abs(older) * 0.05 + 1
+        if newer > older + tol:
+            direction = "up"
+        elif newer < older - tol:
+            direction = "down"
+    return {"direction": direction, "monthly_net": recent}
+
+def _risk_flags(summary, features, forecast_net):
+    flags = []
+    if summary["savings_rate"] < 0.1:
+        flags.append("low_savings")
+    if features.get("utilization", 0.0) > 0.5:
+        flags.append("high_debt_utilization")
+    if features.get("cashflow_var", 0.0) > 0.6:
+        flags.append("volatile_cashflow")
+    if features.get("mandate_punctual", 1.0) < 0.8:
+        flags.append("penalties_or_bounces")
+    if forecast_net < 0:
+        flags.append("negative_cashflow_forecast")
+    return flags
+
+@timed()
+def build_digest(summary: dict, features: dict, score: float, contributions: list, forecast_mean: list) -> dict:
+    """Compact, deterministic advisor context: same inputs always give the same digest."""
+    forecast_net = round(sum(forecast_mean[:FORECAST_DAYS]))
+    weighted = sorted(contributions, key=lambda c: (-c["weight"] * c["value"], c["name"]))
+    return {
+        "version": DIGEST_VERSION,
+        "balance": round(summary["balance"]),
+        "inflow": round(summary["inflow"]),
+        "outflow": round(summary["outflow"]),
+        "savings_rate": summary["savings_rate"],
+        "top_categories": [{"category": a["category"], "pct": a["pct"]} for a in summary["allocation"][:3]],
+        "savings_trend": _savings_trend(summary["cashflow"]),
+        "fairscore": {"score": score, "strengths": [c["name"] for c in weighted[:2]], "weaknesses": [c["name"] for c in weighted[-2:]]},
+        "forecast": {"days": FORECAST_DAYS, "net": forecast_net},
+        "risk_flags": _risk_flags(summary, features, forecast_net),
+    }
+
+@timed()
+def build_context(transactions: list) -> dict:
+    txns = [dict(t) for t in transactions]
+    summary = summarize(txns)
+    features = extract_features_from_transactions(txns)
+    score, contrib, _ = fairscore_v0(features)
+    mean = [0.0] * FORECAST_DAYS
+    if summary["cashflow"]:
+        import pandas as pd
+        cash = pd.DataFrame(summary["cashflow"])
+        mean, _, _ = cashflow_forecast(pd.Series(cash["amount"].values, index=pd.to_datetime(cash["date"])), FORECAST_DAYS)
+    return build_digest(summary, features, score, contrib, [float(v) for v in mean])
+
+class ContextCache:
+    """Per-customer digest cache, rebuilt only when the customer's transactions change."""
+
+    def __init__(self, max_customers: int = 1024):
+        self.max_customers = max_customers
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, customer_id: str):
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(customer_id)
+            return entry[1]
+
+    @timed()
+    def update(self, customer_id: str, transactions: list) -> dict:
+        fingerprint = sha256_hex(canonical(transactions))
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry and entry[0] == fingerprint:
+                self._entries.move_to_end(customer_id)
+                return entry[1]
+        digest = build_context(transactions)
+        with self._lock:
+            self._entries[customer_id] = (fingerprint, digest)
+            self._entries.move_to_end(customer_id)
+            while len(self._entries) > self.max_customers:
+                self._entries.popitem(last=False)
+        return digest
+
+    def invalidate(self, customer_id: str):
+        with self._lock:
+            self._entries.pop(customer_id, None)
@@ -0,0 +1,225 @@
+import importlib.util
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from ..config import DATASET_MAX_BYTES, DATASET_MAX_ENTRIES, DATASET_SPILL_DIR
+from ..utils import timed
+from .features import extract_features_from_frame
+from .scoring import fairscore_v0
+
+# memoized results keyed by (name, arg), e.g. ("forecast", days), keep this many args per name
+MAX_VARIANTS = 2
+
+class DatasetNotFound(KeyError):
+    """Unknown dataset ID, or one that was evicted without being spilled to disk."""
+
+def _parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class _Entry:
+    def __init__(self, frame):
+        self.frame = frame
+        self.frame_bytes = int(frame.memory_usage(deep=True).sum())
+        self.derived = {}  # key -> (value, estimated bytes)
+        self.derived_bytes = 0
+        self.path = None
+        self.writing = None  # frame being spilled; served from memory until the write finishes
+        self.computing = {}  # key -> Future for results being computed right now
+
+    @property
+    def nbytes(self) -> int:
+        return self.frame_bytes + self.derived_bytes
+
+class DatasetStore:
+    """Server-side transaction datasets kept as categorized DataFrames.
+
+    Frames and their memoized results (summary, features, score, forecast) are
+    held in memory up to `max_bytes`, evicting least recently used first. With
+    a `spill_dir` and pyarrow installed, evicted frames are written to Parquet
+    and reloaded on demand; otherwise they are dropped. At most `max_entries`
+    datasets are known at all; beyond that the oldest are forgotten and their
+    Parquet files removed. Disk I/O never happens under the store lock.
+    """
+
+    def __init__(self, max_bytes: int = DATASET_MAX_BYTES, spill_dir: str = DATASET_SPILL_DIR, max_entries: int = DATASET_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir if spill_dir and _parquet_available() else ""
+        self._entries = OrderedDict()
+        self._resident = 0
+        self._lock = threading.Lock()
+
+    @timed()
+    def put(self, transactions) -> str:
+        # pandas-backed stages load on first use so importing the store stays cheap
+        from .pipeline import transactions_frame, categorize_frame
+        frame = categorize_frame(transactions_frame(transactions))
+        dataset_id = uuid.uuid4().hex
+        entry = _Entry(frame)
+        with self._lock:
+            self._entries[dataset_id] = entry
+            self._resident += entry.nbytes
+            work = self._evict()
+        self._spill(work)
+        return dataset_id
+
+    def _evict(self) -> list:
+        """Pick what to drop or spill (caller holds the lock); returns the I/O for `_spill`."""
+        work = []
+        while len(self._entries) > self.max_entries:
+            dataset_id, entry = self._entries.popitem(last=False)
+            if entry.frame is not None:
+                self._resident -= entry.nbytes
+            work.append((dataset_id, entry, None))
+        # never evict the most recently used entry, even if it alone exceeds the budget
+        for dataset_id, entry in list(self._entries.items())[:-1]:
+            if self._resident <= self.max_bytes:
+                break
+            if entry.frame is None:
+                continue
+            self._resident -= entry.nbytes
+            entry.derived.clear()
+            entry.derived_bytes = 0
+            if not self.spill_dir:
+                del self._entries[dataset_id]
+            elif entry.writing is None and entry.path is None:
+                entry.path = os.path.join(self.spill_dir, f"{dataset_id}.parquet")
+                entry.writing = entry.frame
+                work.append((dataset_id, entry, entry.frame))
+            entry.frame = None
+        return work
+
+    def _spill(self, work):
+        for dataset_id, entry, frame in work:
+            if frame is None:
+                # forgotten entirely; a write still in flight removes its own file
+                if entry.path and entry.writing is None:
+                    _remove(entry.path)
+                continue
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                frame.to_parquet(entry.path, index=False)
+                written = True
+            except Exception:
+                written = False
+            with self._lock:
+                entry.writing = None
+                kept = self._entries.get(dataset_id) is entry
+                if kept and not written and entry.frame is None:
+                    del self._entries[dataset_id]  # nothing to reload from: expire like an unspilled eviction
+                    kept = False
+            if not kept:
+                _remove(entry.path)
+
+    @timed("datasets.load")
+    def _load(self, dataset_id: str):
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is None:
+                raise DatasetNotFound(dataset_id)
+            self._entries.move_to_end(dataset_id)
+            frame, work = entry.frame, []
+            if frame is None and entry.writing is not None:
+                frame = entry.frame = entry.writing
+                self._resident += entry.nbytes
+                work = self._evict()
+        if frame is None:
+            import pandas as pd
+            try:
+                frame = pd.read_parquet(entry.path)
+            except FileNotFoundError:
+                raise DatasetNotFound(dataset_id) from None
+            with self._lock:
+                if self._entries.get(dataset_id) is entry and entry.frame is None:
+                    entry.frame = frame
+                    self._resident += entry.nbytes
+                    work = self._evict()
+        self._spill(work)
+        return entry, frame
+
+    def frame(self, dataset_id: str):
+        return self._load(dataset_id)[1]
+
+    def records(self, dataset_id: str) -> list:
+        return self.frame(dataset_id).to_dict("records")
+
+    def _remember(self, entry, key, value) -> list:
+        """Cache a derived result on a resident entry and count it against the budget (lock held)."""
+        if entry.frame is None:
+            return []  # evicted while computing; don't pin results for a spilled frame
+        if isinstance(key, tuple):
+            variants = [k for k in entry.derived if isinstance(k, tuple) and k[0] == key[0]]
+            for old in variants[:max(len(variants) - MAX_VARIANTS + 1, 0)]:
+                size = entry.derived.pop(old)[1]
+                entry.derived_bytes -= size
+                self._resident -= size
+        size = len(json.dumps(value, default=str))  # rough in-memory estimate
+        entry.derived[key] = (value, size)
+        entry.derived_bytes += size
+        self._resident += size
+        return self._evict()
+
+    @timed()
+    def memo(self, dataset_id: str, key, fn):
+        """Compute `fn(frame)` once per key; concurrent callers for the same key share
+        the in-flight result, while other keys of the same dataset don't wait on it."""
+        entry, frame = self._load(dataset_id)
+        with self._lock:
+            cached = entry.derived.get(key)
+            if cached is not None:
+                return cached[0]
+            future = entry.computing.get(key)
+            owner = future is None
+            if owner:
+                future = entry.computing[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            value = fn(frame)
+        except BaseException as e:
+            with self._lock:
+                entry.computing.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            entry.computing.pop(key, None)
+            work = self._remember(entry, key, value)
+        future.set_result(value)
+        self._spill(work)
+        return value
+
+    def summary(self, dataset_id: str) -> dict:
+        from .pipeline import summarize_frame
+        return self.memo(dataset_id, "summary", summarize_frame)
+
+    def features(self, dataset_id: str) -> dict:
+        return self.memo(dataset_id, "features", extract_features_from_frame)
+
+    def fairscore(self, dataset_id: str):
+        features = self.features(dataset_id)
+        return self.memo(dataset_id, "fairscore", lambda _: fairscore_v0(features))
+
+    def forecast(self, dataset_id: str, days: int = 60) -> dict:
+        from .pipeline import forecast_frame
+        return self.memo(dataset_id, ("forecast", days), lambda df: forecast_frame(df, days))
+
+    def delete(self, dataset_id: str):
+        with self._lock:
+            entry = self._entries.pop(dataset_id, None)
+            if entry is None:
+                return
+            if entry.frame is not None:
+                self._resident -= entry.nbytes
+            if entry.writing is not None:
+                return  # the in-flight write sees the entry is gone and removes its file
+        if entry.path:
+            _remove(entry.path)
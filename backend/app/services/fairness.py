@@ -1,5 +1,7 @@
 import numpy as np
+from ..utils import timed
 
+@timed()
 def statistical_parity(scores_f, scores_m, k: int = 650) -> float:
     sf = np.array(scores_f, dtype=float)
     sm = np.array(scores_m, dtype=float)
@@ -7,6 +9,7 @@ def statistical_parity(scores_f, scores_m, k: int = 650) -> float:
     p_m = (sm >= k).mean() if sm.size else 0.0
     return float(p_f - p_m)
 
+@timed()
 def equal_opportunity(y_true_f, scores_f, y_true_m, scores_m, k: int = 650) -> float:
     y_f = np.array(y_true_f, dtype=int)
     s_f = np.array(scores_f, dtype=float)
@@ -18,6 +21,7 @@ def equal_opportunity(y_true_f, scores_f, y_true_m, scores_m, k: int = 650) -> f
         return float(((s >= k) & pos).sum() / denom)
     return tpr(y_f, s_f) - tpr(y_m, s_m)
 
+@timed()
 def threshold_shift(spd: float, eo: float, k: int, delta: float = 0.05) -> int:
     if abs(spd) > delta or abs(eo) > delta:
         return max(580, min(720, k + (-30 if spd < 0 else 30)))
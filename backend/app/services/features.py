@@ -0,0 +1,70 @@
+import re
+from typing import Any, Dict, List
+import numpy as np
+from ..utils import timed
+
+DEFAULT_FEATURES = {"pay_hist": 0.7, "utilization": 0.4, "savings_rate": 0.2, "cashflow_var": 0.3, "history_len": 0.3, "sip_regularity": 0.5, "mandate_punctual": 0.7}
+LOANISH_PATTERNS = ["emi", "loan", "card", "creditcard", "repay"]
+SIP_PATTERNS = ["sip", "mutual fund", "mf", "systematic"]
+PENALTY_PATTERNS = ["reversal", "penalty", "charge", "bounce", "return"]
+
+def _features_from_stats(inflow, outflow, loanish_amount, daily_values, total_months, sip_months, penalty_hits) -> Dict[str, float]:
+    savings_rate = max(inflow - outflow, 0) / max(inflow, 1e-6)
+    utilization = min(loanish_amount / max(inflow, 1e-6), 1.0)
+    if len(daily_values) >= 5:
+        denom = (np.mean([abs(v) for v in daily_values]) or 1.0) * 5
+        cashflow_var = float(min(np.std(daily_values) / denom, 1.0))
+    else:
+        cashflow_var = 0.3
+    history_len = min(total_months / 24.0, 1.0)
+    sip_regularity = min(sip_months / max(total_months, 1), 1.0)
+    mandate_punctual = max(0.9 - 0.05 * penalty_hits, 0.0)
+    return {
+        "pay_hist": round(0.85 + 0.1 * (savings_rate - 0.2), 2) if inflow > 0 else 0.7,
+        "utilization": round(utilization, 2),
+        "savings_rate": round(savings_rate, 2),
+        "cashflow_var": round(cashflow_var, 2),
+        "history_len": round(history_len, 2),
+        "sip_regularity": round(sip_regularity, 2),
+        "mandate_punctual": round(mandate_punctual, 2)
+    }
+
+@timed()
+def extract_features_from_transactions(transactions: List[Dict[str, Any]]) -> Dict[str, float]:
+    if not transactions:
+        return dict(DEFAULT_FEATURES)
+    inflow = sum(t.get('credit', 0) for t in transactions)
+    outflow = sum(t.get('debit', 0) for t in transactions)
+    loanish_transactions = [t for t in transactions if any(pattern in (t.get('description', '') or '').lower() for pattern in LOANISH_PATTERNS)]
+    loanish_amount = sum(t.get('debit', 0) for t in loanish_transactions)
+    daily_net: Dict[str, float] = {}
+    for t in transactions:
+        date = (t.get('date', '') or '').split(' ')[0]
+        daily_net[date] = daily_net.get(date, 0.0) + float(t.get('credit', 0) or 0) - float(t.get('debit', 0) or 0)
+    sip_transactions = [t for t in transactions if any(p in (t.get('description', '') or '').lower() for p in SIP_PATTERNS)]
+    sip_months = len(set((t.get('date', '') or '')[:7] for t in sip_transactions))
+    total_months = len(set((t.get('date', '') or '')[:7] for t in transactions))
+    penalty_hits = sum(1 for t in transactions if any(pattern in (t.get('description', '') or '').lower() for pattern in PENALTY_PATTERNS))
+    return _features_from_stats(inflow, outflow, loanish_amount, list(daily_net.values()), total_months, sip_months, penalty_hits)
+
+def _contains_any(text, patterns):
+    return text.str.contains("|".join(re.escape(p) for p in patterns), regex=True)
+
+@timed()
+def extract_features_from_frame(df) -> Dict[str, float]:
+    """Vectorized equivalent of extract_features_from_transactions for a transaction DataFrame."""
+    if df.empty:
+        return dict(DEFAULT_FEATURES)
+    desc = df["description"].fillna("").astype(str).str.lower()
+    dates = df["date"].fillna("").astype(str)
+    months = dates.str[:7]
+    daily = (df["credit"] - df["debit"]).groupby(dates.str.split(" ").str[0], sort=False).sum()
+    return _features_from_stats(
+        float(df["credit"].sum()),
+        float(df["debit"].sum()),
+        float(df.loc[_contains_any(desc, LOANISH_PATTERNS), "debit"].sum()),
+        daily.tolist(),
+        months.nunique(),
+        months[_contains_any(desc, SIP_PATTERNS)].nunique(),
+        int(_contains_any(desc, PENALTY_PATTERNS).sum()),
+    )
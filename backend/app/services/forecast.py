@@ -1,7 +1,8 @@
-import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
+from ..utils import timed
 
-def cashflow_forecast(series: pd.Series, days=60):
+@timed()
+def cashflow_forecast(series, days=60):
+    import pandas as pd
     s = pd.Series(series).copy()
     if not isinstance(s.index, pd.DatetimeIndex):
         s.index = pd.to_datetime(s.index, errors="coerce")
@@ -20,8 +21,10 @@ def cashflow_forecast(series: pd.Series, days=60):
         return mean, lo, hi
 
     try:
+        from statsmodels.tsa.arima.model import ARIMA
         model = ARIMA(daily, order=(1,0,1))
-        fit = model.fit()
+        with timed("forecast.arima_fit"):
+            fit = model.fit()
         pred = fit.get_forecast(steps=days)
         mean = pred.predicted_mean
         mean = mean.tolist() if hasattr(mean, "tolist") else list(mean)
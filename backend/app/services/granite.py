@@ -1,5 +1,9 @@
 import json
+from functools import lru_cache
 from ..config import IBM_CLOUD_API_KEY, IBM_PROJECT_ID, IBM_REGION, GRANITE_MODEL_ID
+from ..config import ADVISOR_BATCH_WINDOW_MS, ADVISOR_BATCH_MAX, ADVISOR_CONTEXT_TOKENS
+from ..utils import compact_json, timed
+from .batching import MicroBatcher
 
 PREFERRED_MODELS = [
     "ibm/granite-3-8b-instruct",
@@ -7,16 +11,24 @@ PREFERRED_MODELS = [
     "ibm/granite-3-2b-instruct"
 ]
 
+PROMPT_TEMPLATE = """You are a financial copilot. Use this context JSON:
+{context}
+Question: {question}
+Return JSON with keys: answer, actions, route."""
+
 def granite_ready() -> bool:
     return bool(IBM_CLOUD_API_KEY and IBM_PROJECT_ID and IBM_REGION)
 
+@lru_cache(maxsize=4)
 def _get_model(model_id: str):
+    # one client per model: building Credentials/Model authenticates against IBM Cloud
     from ibm_watsonx_ai import Credentials
     from ibm_watsonx_ai.foundation_models import Model
     base = IBM_REGION if IBM_REGION.startswith("http") else f"https://{IBM_REGION}"
     creds = Credentials(api_key=IBM_CLOUD_API_KEY, url=base)
     return Model(model_id=model_id, credentials=creds, project_id=IBM_PROJECT_ID, params={"decoding_method":"greedy","max_new_tokens":256,"temperature":0.25})
 
+@timed()
 def _auto_pick_supported():
     try:
         from ibm_watsonx_ai import Credentials
@@ -37,32 +49,88 @@ def _auto_pick_supported():
     except Exception:
         return None
 
-def advise(question: str, context: dict):
-    if not granite_ready():
-        return {"answer":"Granite credentials missing. Set IBM_CLOUD_API_KEY, IBM_PROJECT_ID, IBM_REGION in .env.","actions":[],"route":"/insights"}
+def _model_with_fallback(call):
+    # try configured model; if unsupported, auto-pick a supported model and retry
     try:
-        # try configured model
-        try:
-            model = _get_model(GRANITE_MODEL_ID)
-            out = model.generate(f"""You are a financial copilot. Use this context JSON:
-{json.dumps(context)}
-Question: {question}
-Return JSON with keys: answer, actions, route.""")
-        except Exception as e:
-            # if unsupported, auto-pick a supported model and retry
-            picked = _auto_pick_supported()
-            if not picked:
-                return {"answer": f"Granite error: {e}", "actions": [], "route": "/insights"}
-            model = _get_model(picked)
-            out = model.generate(f"""You are a financial copilot. Use this context JSON:
-{json.dumps(context)}
-Question: {question}
-Return JSON with keys: answer, actions, route.""")
+        return call(_get_model(GRANITE_MODEL_ID))
+    except Exception:
+        picked = _auto_pick_supported()
+        if not picked:
+            raise
+        return call(_get_model(picked))
 
-        text = out.get("results",[{}])[0].get("generated_text","{}")
+def warm_client():
+    """Build the configured Granite client ahead of the first advisor request."""
+    if granite_ready():
         try:
-            return json.loads(text)
+            _get_model(GRANITE_MODEL_ID)
         except Exception:
-            return {"answer": text, "actions": [], "route": "/insights"}
+            pass
+
+def build_prompt(question: str, context: dict) -> str:
+    return PROMPT_TEMPLATE.format(context=compact_json(context, ADVISOR_CONTEXT_TOKENS), question=question)
+
+def parse_answer(text: str) -> dict:
+    try:
+        return json.loads(text)
+    except Exception:
+        return {"answer": text, "actions": [], "route": "/insights"}
+
+def _generated_text(out) -> str:
+    return out.get("results",[{}])[0].get("generated_text","{}")
+
+def _generate_one(prompt: str) -> str:
+    return _generated_text(_model_with_fallback(lambda model: model.generate(prompt)))
+
+def _rejects_prompt_list(e: Exception) -> bool:
+    # the client does not take a prompt list, as opposed to an upstream/auth failure
+    return isinstance(e, TypeError) or "unsupported" in str(e).lower() or "unexpected keyword" in str(e).lower()
+
+@timed("granite.upstream_generate")
+def _generate_batch(prompts: list) -> list:
+    if len(prompts) > 1:
+        # watsonx accepts a prompt list and returns one result per prompt
+        try:
+            out = _model_with_fallback(lambda model: model.generate(prompt=prompts))
+            if isinstance(out, list) and len(out) == len(prompts):
+                return [_generated_text(o) for o in out]
+        except Exception as e:
+            if not _rejects_prompt_list(e):
+                # an outage would fail each per-prompt retry too; don't spend N more calls finding out
+                return [e] * len(prompts)
+    # single prompt, or a client without list support: one call per prompt
+    results = []
+    for p in prompts:
+        try:
+            results.append(_generate_one(p))
+        except Exception as e:
+            results.append(e)
+    return results
+
+_batcher = MicroBatcher(_generate_batch, window_ms=ADVISOR_BATCH_WINDOW_MS, max_batch=ADVISOR_BATCH_MAX)
+
+@timed()
+def generate(prompt: str) -> str:
+    """Blocking Granite call returning the generated text; raises on upstream errors.
+
+    Concurrent callers are micro-batched into one upstream call unless
+    ADVISOR_BATCH_WINDOW_MS is 0.
+    """
+    if ADVISOR_BATCH_WINDOW_MS <= 0:
+        return _generate_one(prompt)
+    return _batcher.submit(prompt)
+
+@timed()
+def stream_text(prompt: str):
+    """Blocking generator of text chunks as Granite produces them."""
+    model = _model_with_fallback(lambda model: model)
+    yield from model.generate_text_stream(prompt)
+
+@timed()
+def advise(question: str, context: dict):
+    if not granite_ready():
+        return {"answer":"Granite credentials missing. Set IBM_CLOUD_API_KEY, IBM_PROJECT_ID, IBM_REGION in .env.","actions":[],"route":"/insights"}
+    try:
+        return parse_answer(generate(build_prompt(question, context)))
     except Exception as e:
         return {"answer": f"Granite error: {e}", "actions": [], "route": "/insights"}
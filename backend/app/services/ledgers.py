@@ -1,16 +1,17 @@
 import os, json
-from cryptography.fernet import Fernet
 from ..config import PRIVATE_LEDGER_ENC_KEY, PRIVATE_LEDGER_SALT
-from ..utils import canonical, sha256_hex
+from ..utils import canonical, sha256_hex, timed
 
 PRIVATE_CHAIN_FILE = os.path.join(os.getcwd(), "private_chain.jsonl")
 
+@timed()
 def private_append(payload: dict):
     os.makedirs(os.path.dirname(PRIVATE_CHAIN_FILE), exist_ok=True) if os.path.dirname(PRIVATE_CHAIN_FILE) else None
     js = canonical(payload)
     payload_hash = "0x"+sha256_hex(js)
     cipher = js
     if PRIVATE_LEDGER_ENC_KEY:
+        from cryptography.fernet import Fernet
         f = Fernet(PRIVATE_LEDGER_ENC_KEY.encode() if isinstance(PRIVATE_LEDGER_ENC_KEY,str) else PRIVATE_LEDGER_ENC_KEY)
         cipher = f.encrypt(js.encode()).decode()
     prev_hash = "0x"+"0"*64
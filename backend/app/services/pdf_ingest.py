@@ -1,5 +1,6 @@
-import io, re, pdfplumber
+import io, re
 from datetime import datetime
+from ..utils import timed
 
 DATE_RX = re.compile(r"(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})")
 
@@ -19,11 +20,14 @@ def _clean_money(x):
     try: return float(x)
     except: return 0.0
 
+@timed()
 def parse_passbook_pdf(content: bytes):
+    import pdfplumber
     rows=[]
     with pdfplumber.open(io.BytesIO(content)) as pdf:
         for page in pdf.pages:
-            tables = page.extract_tables() or []
+            with timed("pdf_ingest.extract_tables"):
+                tables = page.extract_tables() or []
             for tbl in tables:
                 if len(tbl) < 2: 
                     continue
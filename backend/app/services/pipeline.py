@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from ..utils import timed
+from .pdf_ingest import parse_passbook_pdf
+from .portfolio import auto_category
+from .features import extract_features_from_frame
+from .scoring import fairscore_v0
+from .forecast import cashflow_forecast
+
+TRANSACTION_COLUMNS = ["date", "description", "ref", "debit", "credit", "balance", "category"]
+
+@timed()
+def transactions_frame(transactions) -> pd.DataFrame:
+    """Columnar view of transaction dicts with the same defaults as the API's Transaction model."""
+    df = pd.DataFrame.from_records(list(transactions), columns=TRANSACTION_COLUMNS)
+    for col in ("debit", "credit", "balance"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0).astype(float)
+    for col in ("date", "description", "ref", "category"):
+        df[col] = df[col].fillna("").astype(str)
+    return df
+
+@timed()
+def categorize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    missing = df["category"] == ""
+    if missing.any():
+        desc = df.loc[missing, "description"]
+        lookup = {d: auto_category(d) for d in desc.unique()}
+        df.loc[missing, "category"] = desc.map(lookup)
+    return df
+
+@timed()
+def summarize_frame(df: pd.DataFrame) -> dict:
+    """Vectorized equivalent of portfolio.summarize for a categorized frame."""
+    cf = (df["credit"] - df["debit"]).groupby(df["date"], sort=True).sum()
+    alloc = df["debit"].abs().groupby(df["category"], sort=False).sum()
+    alloc = alloc.iloc[np.argsort(-alloc.to_numpy(), kind="stable")]
+    total_spend = float(alloc.sum()) or 1.0
+    inflow = float(df["credit"].sum())
+    outflow = float(df["debit"].sum())
+    return {
+        "balance": float(df["balance"].iloc[-1]) if len(df) else 0.0,
+        "inflow": inflow,
+        "outflow": outflow,
+        "savings_rate": round(max(inflow - outflow, 0)/max(inflow,1e-6), 3),
+        "cashflow": [{"date": d, "amount": float(a)} for d, a in cf.items()],
+        "allocation": [{"category": k, "amount": float(v), "pct": round(100*float(v)/total_spend, 1)} for k, v in alloc.items()],
+    }
+
+@timed()
+def forecast_frame(df: pd.DataFrame, days: int = 60) -> dict:
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    daily = (df["credit"] - df["debit"]).groupby(dates).sum()
+    if daily.empty:
+        return {"dates": [], "mean": [0.0] * days, "lower": [0.0] * days, "upper": [0.0] * days}
+    mean, lower, upper = cashflow_forecast(daily, days)
+    future = pd.date_range(daily.index.max() + pd.Timedelta(days=1), periods=days, freq="D")
+    return {"dates": future.strftime("%Y-%m-%d").tolist(), "mean": mean, "lower": lower, "upper": upper}
+
+class Pipeline:
+    """Ingest → categorize → summary/features/score, with the forecast running alongside.
+
+    Transactions are parsed once into a DataFrame and every stage works on that
+    frame. Wall-clock milliseconds per stage are recorded in `timings`.
+    """
+
+    def __init__(self, frame: pd.DataFrame, forecast_days: int = 60):
+        self.frame = frame
+        self.forecast_days = forecast_days
+        self.timings = {}
+
+    def _timed(self, name, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    @classmethod
+    def from_pdf(cls, content: bytes, forecast_days: int = 60):
+        timings = {}
+        start = time.perf_counter()
+        rows = parse_passbook_pdf(content)
+        timings["ingest"] = round((time.perf_counter() - start) * 1000, 2)
+        pipeline = cls.from_transactions(rows, forecast_days)
+        pipeline.timings = {**timings, **pipeline.timings}
+        return pipeline
+
+    @classmethod
+    def from_transactions(cls, transactions, forecast_days: int = 60):
+        start = time.perf_counter()
+        pipeline = cls(transactions_frame(transactions), forecast_days)
+        pipeline.timings["frame"] = round((time.perf_counter() - start) * 1000, 2)
+        return pipeline
+
+    @timed()
+    def run(self) -> dict:
+        start = time.perf_counter()
+        df = self._timed("categorize", categorize_frame, self.frame)
+        # the forecast only needs the daily net series, so it runs while summary/score are computed
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline") as pool:
+            forecast = pool.submit(self._timed, "forecast", forecast_frame, df, self.forecast_days)
+            summary = self._timed("summary", summarize_frame, df)
+            features = self._timed("features", extract_features_from_frame, df)
+            score, contrib, version = self._timed("score", fairscore_v0, features)
+            forecast = forecast.result()
+        self.timings["run"] = round((time.perf_counter() - start) * 1000, 2)
+        return {
+            "count": len(df),
+            "summary": summary,
+            "features": features,
+            "fairscore": {"score": score, "contributions": contrib, "version": version},
+            "forecast": forecast,
+            "timings_ms": dict(self.timings),
+        }
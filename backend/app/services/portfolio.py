@@ -1,4 +1,5 @@
 from collections import defaultdict
+from ..utils import timed
 
 def auto_category(description:str) -> str:
     desc = (description or "").lower()
@@ -13,6 +14,7 @@ def auto_category(description:str) -> str:
     if "uber" in desc or "ola" in desc or "irctc" in desc or "air" in desc: return "travel"
     return "other"
 
+@timed()
 def summarize(transactions):
     cf = defaultdict(float)
     alloc = defaultdict(float)
@@ -1,3 +1,6 @@
+from ..utils import timed
+
+@timed()
 def fairscore_v0(features: dict, version: str = "0.1"):
     f = dict(features)
     f["utilization"]  = 1.0 - min(max(f.get("utilization",0.0),0),1)
@@ -1,5 +1,210 @@
 import json, hashlib
+import bisect, functools, inspect, os, sys, threading, time
+from collections import Counter
 def canonical(obj)->str:
     return json.dumps(obj, sort_keys=True, separators=(",",":"))
 def sha256_hex(s:str)->str:
     return hashlib.sha256(s.encode()).hexdigest()
+
+def _shrink(obj, max_items: int, max_chars: int):
+    if isinstance(obj, dict):
+        return {k: _shrink(v, max_items, max_chars) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        items = [_shrink(v, max_items, max_chars) for v in obj[:max_items]]
+        if len(obj) > max_items:
+            items.append(f"...{len(obj) - max_items} more")
+        return items
+    if isinstance(obj, float):
+        return round(obj, 2)
+    if isinstance(obj, str) and len(obj) > max_chars:
+        return obj[:max_chars] + "..."
+    return obj
+
+def _compact(obj) -> str:
+    return json.dumps(obj, separators=(",",":"), default=str)
+
+def _fit(obj, budget: int):
+    # keep leading keys/items that fit and drop the rest whole, so the result stays valid JSON
+    if isinstance(obj, dict):
+        out, used = {}, len(_compact({"truncated": True}))
+        for k, v in obj.items():
+            size = len(_compact({k: v})) - 1  # ',"k":v' inside the enclosing object
+            if used + size <= budget:
+                out[k] = v
+                used += size
+        out["truncated"] = True
+        return out
+    if isinstance(obj, list):
+        out, used = [], len(_compact([f"...{len(obj)} more"]))
+        for v in obj:
+            size = len(_compact(v)) + 1
+            if used + size > budget:
+                break
+            out.append(v)
+            used += size
+        if len(out) < len(obj):
+            out.append(f"...{len(obj) - len(out)} more")
+        return out
+    return obj
+
+def compact_json(obj, max_tokens: int) -> str:
+    """Compact JSON for prompts, trimmed to roughly `max_tokens` (~4 chars per token).
+
+    Always returns parseable JSON: long lists and strings are shortened first,
+    then whole keys/items are dropped and `"truncated": true` is added.
+    """
+    budget = max_tokens * 4
+    s = _compact(obj)
+    for max_items, max_chars in ((50, 200), (20, 120), (10, 80), (5, 40), (2, 20), (0, 20)):
+        if len(s) <= budget:
+            return s
+        shrunk = _shrink(obj, max_items, max_chars)
+        s = _compact(shrunk)
+    return s if len(s) <= budget else _compact(_fit(shrunk, budget))
+
+# ---------- Instrumentation ----------
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_METRIC = "fineo_stage_seconds"
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+_METRICS = {}
+_METRICS_LOCK = threading.Lock()
+
+def histogram(metric: str = STAGE_METRIC, **labels) -> Histogram:
+    key = (metric, tuple(sorted(labels.items())))
+    h = _METRICS.get(key)
+    if h is None:
+        with _METRICS_LOCK:
+            h = _METRICS.setdefault(key, Histogram())
+    return h
+
+class timed:
+    """Time a block (`with timed("forecast.arima_fit"):`) or a function (`@timed()`).
+
+    Observations go to the `fineo_stage_seconds` histogram labelled by stage.
+    As a decorator the stage defaults to `<module>.<qualname>`; generator and
+    coroutine functions are timed until they finish, not just until created.
+    """
+
+    def __init__(self, stage: str = None):
+        self.stage = stage
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.__dict__.setdefault("starts", []).append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        histogram(stage=self.stage).observe(time.perf_counter() - self._local.starts.pop())
+        return False
+
+    def __call__(self, fn):
+        h = histogram(stage=self.stage or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}")
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def agen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                agen = fn(*args, **kwargs)
+                try:
+                    async for item in agen:
+                        yield item
+                finally:
+                    await agen.aclose()  # propagate early close to the wrapped generator
+                    h.observe(time.perf_counter() - start)
+            return agen_wrapper
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    h.observe(time.perf_counter() - start)
+            return async_wrapper
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return (yield from fn(*args, **kwargs))
+                finally:
+                    h.observe(time.perf_counter() - start)
+            return gen_wrapper
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                h.observe(time.perf_counter() - start)
+        return wrapper
+
+def _fmt_labels(labels) -> str:
+    return ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+
+def render_metrics() -> str:
+    """All histograms in Prometheus text exposition format."""
+    lines, seen = [], set()
+    for (metric, labels), h in sorted(_METRICS.items()):
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} histogram")
+        base = _fmt_labels(labels)
+        sep = "," if base else ""
+        with h._lock:
+            counts, total, count = list(h.counts), h.sum, h.count
+        cumulative = 0
+        for le, c in zip(list(h.buckets) + ["+Inf"], counts):
+            cumulative += c
+            lines.append(f'{metric}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+        lines.append(f"{metric}_sum{{{base}}} {total}")
+        lines.append(f"{metric}_count{{{base}}} {count}")
+    return "\n".join(lines) + "\n"
+
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval; `stop()` returns collapsed stacks (flamegraph input)."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return "\n".join(f"{stack} {n}" for stack, n in self.counts.most_common())
@@ -0,0 +1,114 @@
+"""Response encoders: orjson JSON plus opt-in columnar JSON, MessagePack and Arrow IPC."""
+import importlib.util
+import json
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.fineo.columnar+json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.apache.arrow.file": ARROW}
+
+def _default(obj):
+    if hasattr(obj, "tolist"):  # numpy arrays and scalars, pandas Series/Index
+        return obj.tolist()
+    if hasattr(obj, "item"):  # other array-scalar types
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+def _is_records(value) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(r, dict) for r in value)
+
+def columnar(obj):
+    """Turn every list of records into a dict of column arrays, recursively."""
+    if isinstance(obj, dict):
+        return {k: columnar(v) for k, v in obj.items()}
+    if _is_records(obj):
+        keys = tuple(obj[0])
+        if all(tuple(r) == keys for r in obj):
+            # uniform rows (the common case): transpose in one pass
+            return {k: list(col) for k, col in zip(keys, zip(*(r.values() for r in obj)))}
+        merged = {}
+        for r in obj:
+            merged.update(dict.fromkeys(r))
+        return {k: [r.get(k) for r in obj] for k in merged}
+    return obj
+
+def available(media_type: str) -> bool:
+    if media_type == MSGPACK:
+        return importlib.util.find_spec("msgpack") is not None
+    if media_type == ARROW:
+        return importlib.util.find_spec("pyarrow") is not None
+    return media_type in (JSON, COLUMNAR_JSON)
+
+def negotiate(accept: str) -> str:
+    """Pick the highest-quality supported media type from an Accept header; JSON otherwise."""
+    choices = []
+    for i, part in enumerate((accept or "").split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        choices.append((-q, i, _ALIASES.get(media.lower(), media.lower())))
+    for neg_q, _, media in sorted(choices):
+        if neg_q < 0 and available(media):
+            return media
+    return JSON
+
+def _tables(obj, path=()):
+    """Yield (path, columns, length) for every tabular member: records lists or equal-length column dicts."""
+    if _is_records(obj):
+        obj = columnar(obj)
+    elif not isinstance(obj, dict):
+        return
+    if obj and all(isinstance(v, list) for v in obj.values()):
+        lengths = {len(v) for v in obj.values()}
+        if len(lengths) == 1:
+            yield path, obj, lengths.pop()
+            return
+    for key, value in obj.items():
+        yield from _tables(value, path + (key,))
+
+def _without(obj: dict, path: tuple) -> dict:
+    head, *tail = path
+    return {k: (_without(v, tuple(tail)) if k == head and tail else v) for k, v in obj.items() if not (k == head and not tail)}
+
+def _arrow_table(payload: dict):
+    """Largest tabular member becomes the Arrow table; the rest rides along as schema metadata."""
+    import pyarrow as pa
+    found = max(_tables(payload), key=lambda t: t[2], default=None) if isinstance(payload, dict) else None
+    if found is None or not found[0]:
+        return pa.table({}).replace_schema_metadata({"fineo": dumps(payload)})
+    path, columns, _ = found
+    return pa.table(columns).replace_schema_metadata({"fineo": dumps(_without(payload, path)), "fineo_table": ".".join(path)})
+
+def encode(payload, media_type: str = JSON) -> bytes:
+    if media_type == COLUMNAR_JSON:
+        return dumps(columnar(payload))
+    if media_type == MSGPACK:
+        import msgpack
+        return msgpack.packb(columnar(payload), default=_default, use_bin_type=True)
+    if media_type == ARROW:
+        import pyarrow as pa
+        table = _arrow_table(payload)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return dumps(payload)
@@ -10,8 +10,15 @@ from app.services.fairness import statistical_parity, equal_opportunity, thresho
 from app.services.forecast import cashflow_forecast
 from app.services.ledgers import private_append
 from app.services.granite import advise, granite_ready
+from app.warmup import warm_up
+
+@st.cache_resource(show_spinner=False)
+def _warm_up():
+    # once per server process: import statsmodels/pdfplumber/cryptography in the background
+    return warm_up()
 
 st.set_page_config(page_title="FairPredict Backend Demo", layout="wide")
+_warm_up()
 st.title("FairPredict — Ingest → Insights → Forecast → FairScore → Audit → Granite")
 
 # Granite readiness
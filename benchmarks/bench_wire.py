@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: encode time and bytes per response for each wire format
+
+    python benchmarks/bench_wire.py [rows ...]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.app import wire
+from synthetic import forecast_payload, upload_payload
+
+def measure(encode, repeat: int = 5):
+    number = 3
+    best = min(timeit.repeat(encode, number=number, repeat=repeat)) / number
+    return best * 1000, len(encode())
+
+
+def run(rows_list=(100, 1000, 10000)):
+    formats = [("stdlib json", lambda p: json.dumps(p).encode())] + [(m, lambda p, m=m: wire.encode(p, m)) for m in (wire.JSON, wire.COLUMNAR_JSON, wire.MSGPACK, wire.ARROW) if wire.available(m)]
+    results = []
+    for rows in rows_list:
+        for name, payload in (("upload-pdf", upload_payload(rows)), ("forecast-cashflow", forecast_payload(rows))):
+            for fmt, enc in formats:
+                ms, size = measure(lambda: enc(payload))
+                results.append({"response": name, "rows": rows, "format": fmt, "ms": round(ms, 3), "bytes": size})
+    return results
+
+
+if __name__ == "__main__":
+    rows = [int(a) for a in sys.argv[1:]] or [100, 1000, 10000]
+    print(f"{'response':<18} {'rows':>7} {'format':<38} {'ms':>9} {'bytes':>10}")
+    for r in run(rows):
+        print(f"{r['response']:<18} {r['rows']:>7} {r['format']:<38} {r['ms']:>9.3f} {r['bytes']:>10}")
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# make `backend` importable when the suite is run from any directory
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+
+def pytest_collection_modifyitems(config, items):
+    # a plain `pytest` from the repo root stays fast; run the suite with `pytest benchmarks`
+    if config.getoption("benchmark_only", False) or any(os.path.abspath(str(a).split("::")[0]).startswith(BENCH_DIR) for a in config.args):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with `pytest benchmarks`")
+    for item in items:
+        if str(item.path).startswith(BENCH_DIR):
+            item.add_marker(skip)
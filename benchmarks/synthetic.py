@@ -0,0 +1,87 @@
+"""
+Deterministic synthetic data for the benchmark suite
+"""
+
+import io
+import random
+
+# scales each benchmark runs at
+ROWS = [100, 1_000, 10_000]
+PAGES = [1, 10, 50]
+COHORT = [100, 10_000, 100_000]
+BLOCKS = [10, 100, 1_000]
+FORECAST_DAYS = [30, 365, 1_000]
+ROWS_PER_PAGE = 30
+
+DESCRIPTIONS = [
+    "SALARY CREDIT ACME CORP", "UPI/SWIGGY/ORDER", "UPI/ZOMATO", "RENT PAYMENT", "EMI HOME LOAN",
+    "SIP MUTUAL FUND", "ATM CASH WITHDRAWAL", "ELECTRIC BILL", "BROADBAND BILL", "UBER TRIP",
+    "IRCTC TICKET", "CREDITCARD REPAY", "CHEQUE BOUNCE CHARGE", "NEFT TRANSFER", "CAFE COFFEE",
+]
+
+
+def transactions(n: int, seed: int = 7, start_year: int = 2022):
+    """n passbook rows spread over consecutive days, in the shape parse_passbook_pdf returns"""
+    rng = random.Random(seed)
+    balance = 50000.0
+    rows = []
+    for i in range(n):
+        day = i // 3  # ~3 transactions a day
+        year, rest = divmod(day, 336)
+        month, dom = divmod(rest, 28)
+        desc = rng.choice(DESCRIPTIONS)
+        credit = round(rng.uniform(20000, 90000), 2) if desc.startswith("SALARY") else 0.0
+        debit = 0.0 if credit else round(rng.uniform(50, 15000), 2)
+        balance = round(balance + credit - debit, 2)
+        rows.append({"date": f"{start_year + year}-{month + 1:02d}-{dom + 1:02d}", "description": desc, "ref": f"REF{i:08d}", "debit": debit, "credit": credit, "balance": balance, "category": ""})
+    return rows
+
+
+def passbook_pdf(pages: int, rows_per_page: int = ROWS_PER_PAGE, seed: int = 7) -> bytes:
+    """A ruled passbook table of `pages` pages that pdfplumber's extract_tables can read"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import PageBreak, SimpleDocTemplate, Table, TableStyle
+
+    header = ["Date", "Description", "Ref", "Debit", "Credit", "Balance"]
+    rows = transactions(pages * rows_per_page, seed)
+    story = []
+    for p in range(pages):
+        chunk = rows[p * rows_per_page:(p + 1) * rows_per_page]
+        data = [header] + [[f"{r['date'][8:10]}/{r['date'][5:7]}/{r['date'][:4]}", r["description"], r["ref"], f"{r['debit']:,.2f}" if r["debit"] else "", f"{r['credit']:,.2f}" if r["credit"] else "", f"{r['balance']:,.2f}"] for r in chunk]
+        table = Table(data)
+        table.setStyle(TableStyle([("GRID", (0, 0), (-1, -1), 0.5, colors.black), ("FONTSIZE", (0, 0), (-1, -1), 7)]))
+        story.append(table)
+        if p < pages - 1:
+            story.append(PageBreak())
+    buf = io.BytesIO()
+    SimpleDocTemplate(buf, pagesize=A4).build(story)
+    return buf.getvalue()
+
+
+def score_cohorts(n: int, seed: int = 7):
+    """n FairScores per group with slightly shifted means, for the fairness metrics"""
+    rng = random.Random(seed)
+    female = [min(max(rng.gauss(660, 60), 300), 900) for _ in range(n)]
+    male = [min(max(rng.gauss(670, 60), 300), 900) for _ in range(n)]
+    return female, male
+
+
+def audit_payload(i: int = 0):
+    return {"version": "0.1", "k": 650, "spd": -0.012, "eo": 0.004, "delta": 0.05, "recommended_k": 650, "passed": True, "timestamp": f"2024-01-01T00:00:{i % 60:02d}"}
+
+
+def ledger_chain(blocks: int, append):
+    """Grow a chain to `blocks` blocks with the given append function (ledgers.private_append)"""
+    for i in range(blocks):
+        append(audit_payload(i))
+
+
+def upload_payload(rows: int, seed: int = 7):
+    return {"success": True, "dataset_id": "0" * 32, "transactions": transactions(rows, seed), "count": rows}
+
+
+def forecast_payload(days: int, seed: int = 7):
+    rng = random.Random(seed)
+    mean = [rng.uniform(-2000, 2000) for _ in range(days)]
+    return {"success": True, "forecast": {"dates": [f"2025-01-{i % 28 + 1:02d}" for i in range(days)], "mean": mean, "lower": [m - 1500.0 for m in mean], "upper": [m + 1500.0 for m in mean]}}
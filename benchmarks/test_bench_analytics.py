@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("statsmodels")
+
+from backend.app.services.fairness import equal_opportunity, statistical_parity, threshold_shift
+from backend.app.services.features import extract_features_from_frame, extract_features_from_transactions
+from backend.app.services.forecast import cashflow_forecast
+from backend.app.services.pipeline import Pipeline, categorize_frame, summarize_frame, transactions_frame
+from backend.app.services.portfolio import summarize
+from backend.app.services.scoring import fairscore_v0
+from synthetic import COHORT, FORECAST_DAYS, ROWS, score_cohorts, transactions
+
+
+def fresh_rows(rows):
+    # summarize() fills in categories in place, so every round gets uncategorized copies
+    return lambda: (([dict(r) for r in rows],), {})
+
+
+@pytest.mark.benchmark(group="summarize")
+@pytest.mark.parametrize("n", ROWS)
+def test_summarize(benchmark, n):
+    summary = benchmark.pedantic(summarize, setup=fresh_rows(transactions(n)), rounds=10)
+    assert summary["cashflow"]
+
+
+@pytest.mark.benchmark(group="summarize")
+@pytest.mark.parametrize("n", ROWS)
+def test_summarize_frame(benchmark, n):
+    frame = transactions_frame(transactions(n))
+    summary = benchmark(lambda: summarize_frame(categorize_frame(frame.copy())))
+    assert summary["cashflow"]
+
+
+@pytest.mark.benchmark(group="features")
+@pytest.mark.parametrize("n", ROWS)
+def test_extract_features_from_transactions(benchmark, n):
+    rows = transactions(n)
+    features = benchmark(extract_features_from_transactions, rows)
+    assert 0.0 <= features["savings_rate"] <= 1.0
+
+
+@pytest.mark.benchmark(group="features")
+@pytest.mark.parametrize("n", ROWS)
+def test_extract_features_from_frame(benchmark, n):
+    frame = transactions_frame(transactions(n))
+    features = benchmark(extract_features_from_frame, frame)
+    assert features == extract_features_from_transactions(transactions(n))
+
+
+@pytest.mark.benchmark(group="fairscore_v0")
+@pytest.mark.parametrize("n", COHORT[:2])
+def test_fairscore_cohort(benchmark, n):
+    base = extract_features_from_transactions(transactions(200))
+    cohort = [dict(base, savings_rate=(i % 100) / 100) for i in range(n)]
+    scores = benchmark(lambda: [fairscore_v0(f)[0] for f in cohort])
+    assert len(scores) == n
+
+
+@pytest.mark.benchmark(group="fairness")
+@pytest.mark.parametrize("n", COHORT)
+def test_fairness_metrics(benchmark, n):
+    female, male = score_cohorts(n)
+    labels_f, labels_m = [1] * n, [1] * n
+
+    def audit():
+        spd = statistical_parity(female, male, 650)
+        eo = equal_opportunity(labels_f, female, labels_m, male, 650)
+        return threshold_shift(spd, eo, 650)
+
+    assert 580 <= benchmark(audit) <= 720
+
+
+@pytest.mark.benchmark(group="cashflow_forecast")
+@pytest.mark.parametrize("days", FORECAST_DAYS)
+def test_cashflow_forecast(benchmark, days):
+    rows = transactions(days * 3)
+    frame = transactions_frame(rows)
+    series = (frame["credit"] - frame["debit"]).groupby(pd.to_datetime(frame["date"])).sum()
+    mean, lower, upper = benchmark.pedantic(cashflow_forecast, args=(series, 60), rounds=3, iterations=1)
+    assert len(mean) == len(lower) == len(upper) == 60
+
+
+@pytest.mark.benchmark(group="pipeline")
+@pytest.mark.parametrize("n", ROWS)
+def test_pipeline(benchmark, n):
+    rows = transactions(n)
+    result = benchmark.pedantic(lambda: Pipeline.from_transactions(rows).run(), rounds=3, iterations=1)
+    assert result["count"] == n
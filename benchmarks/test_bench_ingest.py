@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("pdfplumber")
+pytest.importorskip("reportlab")
+
+from backend.app.services.pdf_ingest import parse_passbook_pdf
+from synthetic import PAGES, passbook_pdf
+
+
+@pytest.mark.benchmark(group="parse_passbook_pdf")
+@pytest.mark.parametrize("pages", PAGES)
+def test_parse_passbook_pdf(benchmark, pages):
+    content = passbook_pdf(pages)
+    rows = benchmark.pedantic(parse_passbook_pdf, args=(content,), rounds=3, iterations=1)
+    assert rows
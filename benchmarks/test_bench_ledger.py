@@ -0,0 +1,25 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("cryptography")
+
+from backend.app.services import ledgers
+from synthetic import BLOCKS, audit_payload, ledger_chain
+
+
+@pytest.mark.benchmark(group="private_append")
+@pytest.mark.parametrize("blocks", BLOCKS)
+def test_private_append(benchmark, blocks, tmp_path, monkeypatch):
+    chain = tmp_path / "private_chain.jsonl"
+    monkeypatch.setattr(ledgers, "PRIVATE_CHAIN_FILE", str(chain))
+    ledger_chain(blocks, ledgers.private_append)
+    seed = tmp_path / "seed.jsonl"
+    shutil.copy(chain, seed)
+
+    def reset():
+        shutil.copy(seed, chain)
+
+    block_hash, payload_hash = benchmark.pedantic(ledgers.private_append, args=(audit_payload(blocks),), setup=reset, rounds=20)
+    assert block_hash.startswith("0x") and payload_hash.startswith("0x")
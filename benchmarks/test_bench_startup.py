@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("fastapi")
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+STARTUP = {
+    "interpreter": "pass",
+    "import api_server": "import api_server",
+    "import + warm_up": "import api_server\nfrom backend.app.warmup import warm_up, prime_forecast\nwarm_up(prime_forecast, background=False)",
+}
+
+
+def cold_start(code):
+    # a fresh interpreter each round so nothing is cached in sys.modules
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True)
+
+
+@pytest.mark.benchmark(group="startup")
+@pytest.mark.parametrize("name", list(STARTUP))
+def test_cold_start(benchmark, name):
+    benchmark.pedantic(cold_start, args=(STARTUP[name],), rounds=5, iterations=1)
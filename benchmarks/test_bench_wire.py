@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from backend.app import wire
+from synthetic import ROWS, forecast_payload, upload_payload
+
+FORMATS = [m for m in (wire.JSON, wire.COLUMNAR_JSON, wire.MSGPACK, wire.ARROW) if wire.available(m)]
+
+
+@pytest.mark.benchmark(group="encode-upload")
+@pytest.mark.parametrize("media_type", FORMATS)
+@pytest.mark.parametrize("n", ROWS)
+def test_encode_upload(benchmark, n, media_type):
+    payload = upload_payload(n)
+    body = benchmark(wire.encode, payload, media_type)
+    benchmark.extra_info["bytes"] = len(body)
+
+
+@pytest.mark.benchmark(group="encode-forecast")
+@pytest.mark.parametrize("media_type", FORMATS)
+@pytest.mark.parametrize("days", ROWS)
+def test_encode_forecast(benchmark, days, media_type):
+    payload = forecast_payload(days)
+    body = benchmark(wire.encode, payload, media_type)
+    benchmark.extra_info["bytes"] = len(body)
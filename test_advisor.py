@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the async advisor path against a local fake generator
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from backend.app.services.advisor import AsyncAdvisor, AdvisorBusy
+
+
+class FakeGranite:
+    """Stands in for Granite: blocking calls with configurable latency"""
+
+    def __init__(self, latency=0.05, tokens=("Save ", "more ", "each ", "month."), token_latency=0.02):
+        self.latency = latency
+        self.tokens = tokens
+        self.token_latency = token_latency
+        self.running = 0
+        self.peak = 0
+        self.produced = 0
+        self.closed = threading.Event()
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.latency)
+            return json.dumps({"answer": "ok", "actions": [], "route": "/insights"})
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def stream(self, prompt):
+        try:
+            for token in self.tokens:
+                time.sleep(self.token_latency)
+                self.produced += 1
+                yield token
+        finally:
+            self.closed.set()
+
+
+def test_ask_does_not_block_event_loop():
+    fake = FakeGranite(latency=0.1)
+    advisor = AsyncAdvisor(generate=fake.generate, stream=fake.stream, max_concurrency=2, max_queue=10)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        answers = await asyncio.gather(*(advisor.ask("q", {}) for _ in range(6)))
+        t.cancel()
+        return answers, ticks
+
+    answers, ticks = asyncio.run(main())
+    advisor.close()
+    assert all(a["answer"] == "ok" for a in answers)
+    assert fake.peak == 2
+    assert ticks >= 10
+
+
+def test_backpressure_rejects_when_queue_full():
+    fake = FakeGranite(latency=0.1)
+    advisor = AsyncAdvisor(generate=fake.generate, stream=fake.stream, max_concurrency=1, max_queue=1)
+
+    async def main():
+        return await asyncio.gather(*(advisor.ask("q", {}) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    advisor.close()
+    assert sum(isinstance(r, AdvisorBusy) for r in results) == 1
+    assert sum(isinstance(r, dict) for r in results) == 2
+
+
+def test_stream_yields_tokens_in_order():
+    fake = FakeGranite()
+    advisor = AsyncAdvisor(generate=fake.generate, stream=fake.stream, max_concurrency=1)
+
+    async def main():
+        tokens = await advisor.stream("q", {})
+        return [t async for t in tokens]
+
+    assert asyncio.run(main()) == list(fake.tokens)
+    advisor.close()
+
+
+def test_stream_close_cancels_upstream():
+    fake = FakeGranite(tokens=tuple(f"t{i} " for i in range(50)), token_latency=0.01)
+    advisor = AsyncAdvisor(generate=fake.generate, stream=fake.stream, max_concurrency=1)
+
+    async def main():
+        tokens = await advisor.stream("q", {})
+        got = []
+        async for t in tokens:
+            got.append(t)
+            if len(got) == 2:
+                break
+        await tokens.aclose()  # what the SSE endpoint does when the client goes away
+        await asyncio.get_running_loop().run_in_executor(None, fake.closed.wait, 2)
+        return got
+
+    got = asyncio.run(main())
+    advisor.close()
+    assert got == ["t0 ", "t1 "]
+    assert fake.closed.is_set()
+    assert fake.produced < 50
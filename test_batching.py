@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for advisor request micro-batching and prompt context trimming
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app.services import granite
+from backend.app.services.batching import MicroBatcher
+from backend.app.utils import compact_json
+
+
+def test_concurrent_calls_share_one_batch():
+    calls = []
+
+    def run_batch(items):
+        calls.append(list(items))
+        time.sleep(0.01)
+        return [i * 2 for i in items]
+
+    batcher = MicroBatcher(run_batch, window_ms=50, max_batch=16)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(batcher.submit, range(8)))
+    assert results == [i * 2 for i in range(8)]
+    assert len(calls) < 8
+    assert sorted(sum(calls, [])) == list(range(8))
+
+
+def test_batch_is_flushed_when_full():
+    batcher = MicroBatcher(lambda items: items, window_ms=10_000, max_batch=2)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert sorted(pool.map(batcher.submit, ["a", "b"])) == ["a", "b"]
+    assert time.perf_counter() - start < 5
+
+
+def test_errors_are_delivered_per_item():
+    def run_batch(items):
+        return [ValueError(i) if i == "bad" else i for i in items]
+
+    batcher = MicroBatcher(run_batch, window_ms=20, max_batch=2)
+    errors = []
+
+    def call(item):
+        try:
+            return batcher.submit(item)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in ("ok", "bad")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 1
+
+
+def test_compact_json_respects_token_budget():
+    context = {"transactions": [{"date": "2024-01-%02d" % (i % 28 + 1), "description": "UPI payment " * 5, "debit": 123.456} for i in range(500)], "balance": 1000.0}
+    small = compact_json({"balance": 1000.0}, 100)
+    assert json.loads(small) == {"balance": 1000.0}
+    trimmed = compact_json(context, 200)
+    assert len(trimmed) <= 800
+    assert json.loads(trimmed)["balance"] == 1000.0
+
+
+def test_compact_json_drops_whole_keys_from_wide_dicts():
+    wide = {f"k{i}": float(i) for i in range(2000)}
+    trimmed = compact_json(wide, 100)
+    parsed = json.loads(trimmed)
+    assert len(trimmed) <= 400
+    assert parsed["truncated"] is True
+    assert parsed["k0"] == 0.0
+    assert all(parsed[k] == wide[k] for k in parsed if k != "truncated")
+
+
+def test_compact_json_truncates_long_top_level_lists():
+    rows = [{"description": f"payment {i}"} for i in range(1000)]
+    trimmed = compact_json(rows, 20)
+    parsed = json.loads(trimmed)
+    assert len(trimmed) <= 80
+    assert parsed[-1].startswith("...")
+
+
+class FakeModel:
+    def __init__(self, batch_error=None):
+        self.batch_error = batch_error
+        self.calls = []
+
+    def generate(self, prompt):
+        self.calls.append(prompt)
+        if isinstance(prompt, list):
+            if self.batch_error:
+                raise self.batch_error
+            return [{"results": [{"generated_text": p.upper()}]} for p in prompt]
+        return {"results": [{"generated_text": prompt.upper()}]}
+
+
+def _patch_model(monkeypatch, model):
+    picks = []
+    monkeypatch.setattr(granite, "_get_model", lambda model_id: model)
+    monkeypatch.setattr(granite, "_auto_pick_supported", lambda: picks.append(1))
+    return picks
+
+
+def test_generate_batch_sends_one_upstream_call(monkeypatch):
+    model = FakeModel()
+    _patch_model(monkeypatch, model)
+    assert granite._generate_batch(["a", "b"]) == ["A", "B"]
+    assert model.calls == [["a", "b"]]
+
+
+def test_generate_batch_falls_back_when_list_form_is_rejected(monkeypatch):
+    model = FakeModel(batch_error=TypeError("prompt must be str"))
+    _patch_model(monkeypatch, model)
+    assert granite._generate_batch(["a", "b"]) == ["A", "B"]
+    assert model.calls == [["a", "b"], "a", "b"]
+
+
+def test_generate_batch_shares_upstream_errors_without_retrying(monkeypatch):
+    model = FakeModel(batch_error=ConnectionError("503 from upstream"))
+    _patch_model(monkeypatch, model)
+    results = granite._generate_batch(["a", "b", "c"])
+    assert all(isinstance(r, ConnectionError) for r in results) and len(results) == 3
+    assert model.calls == [["a", "b", "c"]]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for per-customer advisor context digests and their cache
+"""
+
+import random
+
+from backend.app.services import context
+from backend.app.services.context import ContextCache, build_digest, _risk_flags, _savings_trend
+from backend.app.services.scoring import fairscore_v0
+
+SUMMARY = {
+    "balance": 12345.678,
+    "inflow": 50000.4,
+    "outflow": 42000.6,
+    "savings_rate": 0.16,
+    "cashflow": [{"date": "2024-0%d-15" % m, "amount": 1000.0 * m} for m in range(1, 7)],
+    "allocation": [{"category": c, "amount": a, "pct": p} for c, a, p in (("Rent", 20000.0, 47.6), ("Food", 9000.0, 21.4), ("Travel", 7000.0, 16.7), ("Bills", 6000.0, 14.3))],
+}
+FEATURES = {"pay_hist": 0.85, "utilization": 0.2, "savings_rate": 0.16, "cashflow_var": 0.3, "history_len": 0.25, "sip_regularity": 0.5, "mandate_punctual": 0.9}
+
+
+def test_build_digest_is_deterministic():
+    score, contrib, _ = fairscore_v0(FEATURES)
+    forecast = [10.0] * 60
+    first = build_digest(SUMMARY, FEATURES, score, contrib, forecast)
+    shuffled = list(contrib)
+    random.Random(7).shuffle(shuffled)
+    assert build_digest(SUMMARY, FEATURES, score, shuffled, forecast) == first
+    assert first["top_categories"] == [{"category": "Rent", "pct": 47.6}, {"category": "Food", "pct": 21.4}, {"category": "Travel", "pct": 16.7}]
+    assert first["forecast"] == {"days": context.FORECAST_DAYS, "net": 300}
+    assert first["balance"] == 12346
+
+
+def test_savings_trend_direction_and_window():
+    rising = [{"date": "2024-%02d-01" % m, "amount": 100.0 * m} for m in range(1, 9)]
+    trend = _savings_trend(rising)
+    assert trend["direction"] == "up"
+    assert [r["month"] for r in trend["monthly_net"]] == ["2024-%02d" % m for m in range(3, 9)]
+    assert _savings_trend(list(reversed(rising)))["direction"] == "up"
+    falling = [{"date": "2024-%02d-01" % m, "amount": 1000.0 - 100.0 * m} for m in range(1, 7)]
+    assert _savings_trend(falling)["direction"] == "down"
+    assert _savings_trend([{"date": "2024-01-01", "amount": 5.0}])["direction"] == "flat"
+    worsening = [{"date": "2024-%02d-01" % m, "amount": -100.0 if m <= 3 else -110.0} for m in range(1, 7)]
+    assert _savings_trend(worsening)["direction"] == "down"
+    improving = [{"date": "2024-%02d-01" % m, "amount": -110.0 if m <= 3 else -100.0} for m in range(1, 7)]
+    assert _savings_trend(improving)["direction"] == "up"
+    slightly_worse = [{"date": "2024-%02d-01" % m, "amount": -100.0 if m <= 3 else -103.0} for m in range(1, 7)]
+    assert _savings_trend(slightly_worse)["direction"] == "flat"
+
+
+def test_risk_flags():
+    assert _risk_flags(SUMMARY, FEATURES, 100) == []
+    risky = {**FEATURES, "utilization": 0.7, "cashflow_var": 0.8, "mandate_punctual": 0.6}
+    assert _risk_flags({**SUMMARY, "savings_rate": 0.02}, risky, -1) == [
+        "low_savings", "high_debt_utilization", "volatile_cashflow", "penalties_or_bounces", "negative_cashflow_forecast",
+    ]
+
+
+def test_cache_rebuilds_only_when_transactions_change(monkeypatch):
+    builds = []
+    monkeypatch.setattr(context, "build_context", lambda txns: builds.append(list(txns)) or {"n": len(txns)})
+    cache = ContextCache(max_customers=2)
+    txns = [{"date": "2024-01-01", "description": "Salary", "credit": 100.0}]
+    assert cache.update("alice", txns) == {"n": 1}
+    assert cache.update("alice", [dict(t) for t in txns]) == {"n": 1}
+    assert len(builds) == 1
+    assert cache.update("alice", txns + [{"date": "2024-01-02", "description": "Rent", "debit": 50.0}]) == {"n": 2}
+    assert len(builds) == 2
+    assert cache.get("alice") == {"n": 2}
+    cache.invalidate("alice")
+    assert cache.get("alice") is None
+
+
+def test_cache_evicts_least_recently_used_customer(monkeypatch):
+    monkeypatch.setattr(context, "build_context", lambda txns: {"n": len(txns)})
+    cache = ContextCache(max_customers=2)
+    for customer in ("a", "b"):
+        cache.update(customer, [])
+    cache.get("a")
+    cache.update("c", [])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the server-side dataset store: eviction, spill/reload, memoization and cleanup
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from backend.app.services import datasets as datasets_module
+from backend.app.services.datasets import DatasetNotFound, DatasetStore
+
+
+def rows(n=50, seed=0):
+    return [{"date": f"2024-01-{i % 28 + 1:02d}", "description": "SALARY" if i % 10 == 0 else f"UPI/SHOP{seed}", "debit": 0.0 if i % 10 == 0 else 10.0 + i, "credit": 5000.0 if i % 10 == 0 else 0.0, "balance": 1000.0 + i, "category": ""} for i in range(n)]
+
+
+def frame_bytes():
+    store = DatasetStore(max_bytes=1 << 40, spill_dir="")
+    return store._entries[store.put(rows())].frame_bytes
+
+
+def test_lru_eviction_without_spill_dir():
+    store = DatasetStore(max_bytes=int(frame_bytes() * 2.5), spill_dir="")
+    a, b = store.put(rows(seed=1)), store.put(rows(seed=2))
+    store.frame(a)  # a is now the most recently used
+    c = store.put(rows(seed=3))
+    assert len(store.frame(a)) == len(store.frame(c)) == 50
+    with pytest.raises(DatasetNotFound):
+        store.frame(b)
+    assert store._resident <= store.max_bytes
+
+
+def test_spill_and_reload(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = DatasetStore(max_bytes=int(frame_bytes() * 1.5), spill_dir=str(tmp_path))
+    a = store.put(rows(seed=1))
+    expected = store.records(a)
+    b = store.put(rows(seed=2))
+    assert os.path.exists(tmp_path / f"{a}.parquet")
+    assert store._entries[a].frame is None
+    assert store.records(a) == expected
+    assert store._entries[b].frame is None  # reloading a pushed b out in turn
+    assert store._resident <= store.max_bytes
+
+
+def test_entry_cap_forgets_oldest_and_removes_spill_files(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = DatasetStore(max_bytes=1, spill_dir=str(tmp_path), max_entries=2)
+    a, b = store.put(rows(seed=1)), store.put(rows(seed=2))
+    assert os.path.exists(tmp_path / f"{a}.parquet")
+    c = store.put(rows(seed=3))
+    with pytest.raises(DatasetNotFound):
+        store.frame(a)
+    assert not os.path.exists(tmp_path / f"{a}.parquet")
+    assert len(store._entries) == 2
+    assert len(store.frame(b)) == len(store.frame(c)) == 50
+
+
+def test_delete_removes_spill_file(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = DatasetStore(max_bytes=1, spill_dir=str(tmp_path))
+    a = store.put(rows(seed=1))
+    store.put(rows(seed=2))
+    path = tmp_path / f"{a}.parquet"
+    assert os.path.exists(path)
+    store.delete(a)
+    assert not os.path.exists(path)
+    with pytest.raises(DatasetNotFound):
+        store.frame(a)
+    store.delete(a)  # idempotent
+
+
+def test_memo_computes_once_and_counts_against_budget():
+    store = DatasetStore(max_bytes=1 << 40, spill_dir="")
+    a = store.put(rows())
+    before = store._resident
+    calls = []
+    first = store.memo(a, "summary", lambda df: calls.append(1) or {"n": len(df)})
+    assert store.memo(a, "summary", lambda df: calls.append(1)) == first == {"n": 50}
+    assert calls == [1]
+    assert store._resident > before
+    store.delete(a)
+    assert store._resident == 0
+
+
+def test_forecast_memo_keeps_only_recent_horizons(monkeypatch):
+    store = DatasetStore(max_bytes=1 << 40, spill_dir="")
+    a = store.put(rows())
+    for days in (7, 14, 30, 60):
+        store.memo(a, ("forecast", days), lambda df, days=days: {"mean": [0.0] * days})
+    forecasts = [k for k in store._entries[a].derived if isinstance(k, tuple)]
+    assert forecasts == [("forecast", 30), ("forecast", 60)]
+    assert len(forecasts) == datasets_module.MAX_VARIANTS
+    entry = store._entries[a]
+    assert entry.derived_bytes == sum(size for _, size in entry.derived.values())
+
+
+def test_derived_results_are_dropped_on_eviction():
+    store = DatasetStore(max_bytes=int(frame_bytes() * 1.5), spill_dir="")
+    a = store.put(rows(seed=1))
+    store.memo(a, "summary", lambda df: {"n": len(df)})
+    b = store.put(rows(seed=2))
+    assert a not in store._entries
+    assert store._resident == store._entries[b].nbytes
+
+
+def test_memo_keys_compute_independently():
+    store = DatasetStore(max_bytes=1 << 40, spill_dir="")
+    a = store.put(rows())
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def slow_forecast(df):
+        calls.append("forecast")
+        started.set()
+        release.wait(5)
+        return {"mean": [0.0]}
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(store.memo, a, ("forecast", 7), slow_forecast)
+        started.wait(5)
+        second = pool.submit(store.memo, a, ("forecast", 7), slow_forecast)
+        # a different key of the same dataset is not held up by the running forecast
+        assert store.memo(a, "summary", lambda df: {"n": len(df)}) == {"n": 50}
+        assert not first.done()
+        release.set()
+        assert first.result(5) == second.result(5) == {"mean": [0.0]}
+    assert calls == ["forecast"]
+
+
+def test_memo_failure_is_not_cached():
+    store = DatasetStore(max_bytes=1 << 40, spill_dir="")
+    a = store.put(rows())
+
+    def fail(df):
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        store.memo(a, "summary", fail)
+    assert store.memo(a, "summary", lambda df: {"ok": True}) == {"ok": True}
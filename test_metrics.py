@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for stage timers, latency histograms and the Prometheus /metrics output
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.app.utils import Histogram, histogram, render_metrics, timed
+
+
+def stage(name):
+    return histogram(stage=f"test_metrics.{name}")
+
+
+def test_histogram_bucket_bounds_are_inclusive():
+    h = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 1.0, 2.0):
+        h.observe(value)
+    # Prometheus `le` buckets: a value equal to a bound belongs to that bound
+    assert h.counts == [2, 2, 1]
+    assert h.count == 5 and h.sum == pytest.approx(3.65)
+
+
+def test_timed_sync_function_and_block():
+    @timed("test_metrics.sync")
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    with pytest.raises(ZeroDivisionError):
+        with timed("test_metrics.block"):
+            1 / 0
+    assert stage("sync").count == 1
+    assert stage("block").count == 1
+    assert add.__name__ == "add"
+
+
+def test_timed_generator_covers_full_iteration():
+    @timed("test_metrics.gen")
+    def gen():
+        yield 1
+        time.sleep(0.02)
+        yield 2
+
+    it = gen()
+    assert next(it) == 1
+    assert stage("gen").count == 0
+    assert list(it) == [2]
+    assert stage("gen").count == 1 and stage("gen").sum >= 0.02
+
+
+def test_timed_coroutine():
+    @timed("test_metrics.coro")
+    async def work():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    assert asyncio.run(work()) == "done"
+    assert stage("coro").count == 1 and stage("coro").sum >= 0.01
+
+
+def test_timed_async_generator_propagates_aclose():
+    closed = []
+
+    @timed("test_metrics.agen")
+    async def agen():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.append(True)
+
+    async def consume_two():
+        it = agen()
+        assert [await it.__anext__(), await it.__anext__()] == [0, 1]
+        await it.aclose()
+        assert closed == [True]  # closed synchronously, not left to the loop's finalizer
+
+    asyncio.run(consume_two())
+    assert stage("agen").count == 1
+
+
+def test_default_stage_name_is_module_and_qualname():
+    @timed()
+    def helper():
+        pass
+
+    helper()
+    assert histogram(stage="test_metrics.test_default_stage_name_is_module_and_qualname.<locals>.helper").count == 1
+
+
+def test_render_metrics_prometheus_text():
+    h = histogram("test_render_seconds", route='/a"b')
+    h.observe(0.001)
+    h.observe(0.3)
+    lines = render_metrics().splitlines()
+    assert "# TYPE test_render_seconds histogram" in lines
+    assert 'test_render_seconds_bucket{route="/a\\"b",le="0.001"} 1' in lines
+    assert 'test_render_seconds_bucket{route="/a\\"b",le="0.25"} 1' in lines
+    assert 'test_render_seconds_bucket{route="/a\\"b",le="0.5"} 2' in lines
+    assert 'test_render_seconds_bucket{route="/a\\"b",le="+Inf"} 2' in lines
+    assert 'test_render_seconds_count{route="/a\\"b"} 2' in lines
+    assert sum(line.startswith("# TYPE test_render_seconds") for line in lines) == 1
+
+
+@pytest.fixture
+def api():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    pytest.importorskip("uvicorn")
+    import api_server
+    from fastapi.testclient import TestClient
+    return api_server, TestClient(api_server.app, raise_server_exceptions=False)
+
+
+def test_metrics_endpoint(api):
+    api_server, client = api
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'fineo_http_request_seconds_count{method="GET",route="/health"}' in response.text
+
+
+def test_failed_request_is_recorded_and_profiler_stopped(api, monkeypatch, tmp_path):
+    api_server, client = api
+    monkeypatch.setattr(api_server, "PROFILE_REQUESTS", True)
+    monkeypatch.setattr(api_server, "PROFILE_DIR", str(tmp_path))
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    api_server.app.add_api_route("/_test_boom", boom)
+    try:
+        before = histogram("fineo_http_request_seconds", method="GET", route="/_test_boom").count
+        assert client.get("/_test_boom?profile=1").status_code == 500
+    finally:
+        api_server.app.router.routes.pop()
+    assert histogram("fineo_http_request_seconds", method="GET", route="/_test_boom").count == before + 1
+    assert not any(t.name == "sampling-profiler" and t.is_alive() for t in threading.enumerate())
+    assert list(tmp_path.iterdir())
+
+
+def test_stream_duration_is_recorded(api, monkeypatch):
+    api_server, client = api
+    from backend.app.services.advisor import AsyncAdvisor
+
+    def tokens(prompt):
+        for t in ("a", "b", "c"):
+            time.sleep(0.02)
+            yield t
+
+    monkeypatch.setattr(api_server, "granite_ready", lambda: True)
+    monkeypatch.setattr(api_server, "advisor", AsyncAdvisor(generate=lambda p: "{}", stream=tokens))
+    h = histogram("fineo_http_stream_seconds", method="POST", route="/ask-advisor/stream")
+    before = h.count
+    response = client.post("/ask-advisor/stream", json={"question": "hi"})
+    assert response.text.count("data: {\"token\"") == 3
+    assert h.count == before + 1
+    assert h.sum >= 0.06
+
+
+def test_warm_up_forecast_does_not_touch_stage_histograms():
+    pytest.importorskip("statsmodels")
+    from backend.app.warmup import prime_forecast
+    stages = ("forecast.cashflow_forecast", "forecast.arima_fit")
+    before = [histogram(stage=s).count for s in stages]
+    prime_forecast()
+    assert [histogram(stage=s).count for s in stages] == before
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests that the DataFrame pipeline matches the list-based services
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from backend.app.services.features import extract_features_from_frame, extract_features_from_transactions
+from backend.app.services.pipeline import Pipeline, categorize_frame, forecast_frame, summarize_frame, transactions_frame
+from backend.app.services.portfolio import summarize
+
+DESCRIPTIONS = ["SALARY CREDIT", "UPI/SWIGGY", "RENT PAYMENT", "EMI HOME LOAN", "SIP MUTUAL FUND", "ATM CASH", "CHEQUE BOUNCE CHARGE", "ELECTRIC BILL"]
+
+
+def rows(n=120, seed=3):
+    """Uncategorized passbook rows over ~4 months, a few already categorized or with a time suffix"""
+    rng = random.Random(seed)
+    out, balance = [], 10000.0
+    for i in range(n):
+        desc = rng.choice(DESCRIPTIONS)
+        credit = round(rng.uniform(20000, 60000), 2) if desc.startswith("SALARY") else 0.0
+        debit = 0.0 if credit else round(rng.uniform(10, 5000), 2)
+        balance = round(balance + credit - debit, 2)
+        date = f"2024-{i // 28 % 12 + 1:02d}-{i % 28 + 1:02d}" + (" 10:30" if i % 17 == 0 else "")
+        out.append({"date": date, "description": desc, "ref": f"R{i}", "debit": debit, "credit": credit, "balance": balance, "category": "Gifts" if i % 11 == 0 else ""})
+    return out
+
+
+def test_summarize_frame_matches_summarize():
+    expected = summarize([dict(r) for r in rows()])
+    actual = summarize_frame(categorize_frame(transactions_frame(rows())))
+    assert actual["balance"] == expected["balance"]
+    assert actual["savings_rate"] == expected["savings_rate"]
+    assert actual["inflow"] == pytest.approx(expected["inflow"])
+    assert actual["outflow"] == pytest.approx(expected["outflow"])
+    assert [c["date"] for c in actual["cashflow"]] == [c["date"] for c in expected["cashflow"]]
+    assert [c["amount"] for c in actual["cashflow"]] == pytest.approx([c["amount"] for c in expected["cashflow"]])
+    assert [(a["category"], a["pct"]) for a in actual["allocation"]] == [(a["category"], a["pct"]) for a in expected["allocation"]]
+
+
+def test_extract_features_from_frame_matches_list_version():
+    assert extract_features_from_frame(transactions_frame(rows())) == extract_features_from_transactions(rows())
+    assert extract_features_from_frame(transactions_frame([])) == extract_features_from_transactions([])
+
+
+def test_forecast_frame_shape():
+    pytest.importorskip("statsmodels")
+    out = forecast_frame(categorize_frame(transactions_frame(rows())), 14)
+    assert len(out["dates"]) == len(out["mean"]) == len(out["lower"]) == len(out["upper"]) == 14
+    assert out["dates"][0] == "2024-05-09"
+    empty = forecast_frame(transactions_frame([]), 5)
+    assert empty == {"dates": [], "mean": [0.0] * 5, "lower": [0.0] * 5, "upper": [0.0] * 5}
+
+
+def test_pipeline_runs_every_stage():
+    pytest.importorskip("statsmodels")
+    result = Pipeline.from_transactions(rows(), forecast_days=7).run()
+    assert result["count"] == 120
+    assert result["features"] == extract_features_from_transactions(rows())
+    assert 300 <= result["fairscore"]["score"] <= 900
+    assert len(result["forecast"]["mean"]) == 7
+    assert set(result["timings_ms"]) == {"frame", "categorize", "forecast", "summary", "features", "score", "run"}
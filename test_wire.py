@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for response encoding and Accept-header negotiation
+"""
+
+import json
+
+import pytest
+
+from backend.app import wire
+
+
+def test_negotiate_prefers_highest_quality_supported_type():
+    assert wire.negotiate("") == wire.JSON
+    assert wire.negotiate("*/*") == wire.JSON
+    assert wire.negotiate(f"{wire.COLUMNAR_JSON};q=0.5, application/json") == wire.JSON
+    assert wire.negotiate(f"text/html, {wire.COLUMNAR_JSON}") == wire.COLUMNAR_JSON
+    assert wire.negotiate("application/vnd.unknown") == wire.JSON
+
+
+def test_columnar_transposes_record_lists():
+    payload = {"success": True, "transactions": [{"date": "2024-01-01", "debit": 1.5}, {"date": "2024-01-02", "credit": 2.0}]}
+    out = json.loads(wire.encode(payload, wire.COLUMNAR_JSON))
+    assert out["success"] is True
+    assert out["transactions"] == {"date": ["2024-01-01", "2024-01-02"], "debit": [1.5, None], "credit": [None, 2.0]}
+
+
+def test_json_matches_stdlib():
+    payload = {"forecast": {"dates": ["2024-01-01"], "mean": [1.25]}, "count": 1}
+    assert json.loads(wire.encode(payload)) == payload
+
+
+def test_stdlib_fallback_handles_numpy_values(monkeypatch):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr(wire, "orjson", None)
+    out = json.loads(wire.dumps({"x": np.array([1.0, 2.0]), "n": np.int64(3)}))
+    assert out == {"x": [1.0, 2.0], "n": 3}
+
+
+def test_msgpack_round_trip_with_numpy_values():
+    msgpack = pytest.importorskip("msgpack")
+    np = pytest.importorskip("numpy")
+    payload = {"rows": [{"date": "2024-01-01", "debit": np.float64(1.5)}, {"date": "2024-01-02", "debit": 2.0}], "mean": np.array([1.0, 2.0]), "count": np.int64(2)}
+    out = msgpack.unpackb(wire.encode(payload, wire.MSGPACK), raw=False)
+    assert out == {"rows": {"date": ["2024-01-01", "2024-01-02"], "debit": [1.5, 2.0]}, "mean": [1.0, 2.0], "count": 2}
+
+
+def test_arrow_round_trip_keeps_table_and_metadata():
+    pa = pytest.importorskip("pyarrow")
+    np = pytest.importorskip("numpy")
+    payload = {"success": True, "count": np.int64(2), "bounds": np.array([0.5, 1.5]), "transactions": [{"date": "2024-01-01", "debit": 1.5}, {"date": "2024-01-02", "debit": 2.0}]}
+    table = pa.ipc.open_stream(wire.encode(payload, wire.ARROW)).read_all()
+    assert table.to_pydict() == {"date": ["2024-01-01", "2024-01-02"], "debit": [1.5, 2.0]}
+    meta = table.schema.metadata
+    assert meta[b"fineo_table"] == b"transactions"
+    assert json.loads(meta[b"fineo"]) == {"success": True, "count": 2, "bounds": [0.5, 1.5]}